@@ -0,0 +1,145 @@
+from db_connection import get_connection
+from make_impurities_db import migrate
+
+
+def data_version(conn):
+    """Counter bumped by triggers on every change to raw_materials (see make_impurities_db)."""
+    return conn.execute('SELECT version FROM data_version WHERE id = 1').fetchone()[0]
+
+
+def refresh_aggregates(conn):
+    """
+    Rebuild brand_component_totals: total impurity ppm, number of impurities
+    and worst impurity per component and brand. A component's own assay row
+    is not counted as an impurity (see the impurity_rows view).
+    """
+    with conn:
+        version = data_version(conn)
+        conn.execute('DELETE FROM brand_component_totals')
+        conn.execute(
+            '''INSERT INTO brand_component_totals
+                   (component_id, brand_id, total_ppm, impurity_count, worst_impurity_id, worst_ppm)
+               SELECT s.component_id, s.brand_id, COALESCE(SUM(r.ppm), 0), COUNT(r.id), r.impurity_id, MAX(r.ppm)
+               FROM (SELECT DISTINCT component_id, brand_id FROM raw_materials) s
+               LEFT JOIN impurity_rows r ON r.component_id = s.component_id AND r.brand_id = s.brand_id
+               GROUP BY s.component_id, s.brand_id'''
+        )  # SQLite takes the bare impurity_id from the row holding MAX(ppm)
+        conn.execute(
+            'INSERT OR REPLACE INTO aggregate_state (name, built_version) VALUES (?, ?)',
+            ('brand_component_totals', version),
+        )
+    return version
+
+
+class BrandSelector:
+    """
+    Lowest-impurity sourcing per component.
+
+    Rankings by total impurity come from the brand_component_totals table,
+    rankings by one impurity from the (impurity_id, component_id, brand_id)
+    index of raw_materials. Answers are cached in memory; every query first
+    reads the data version (one row), and when raw_materials changed the
+    aggregates are rebuilt and the cache is emptied.
+    """
+
+    def __init__(self, conn=None):
+        self.conn = conn or get_connection()
+        migrate(self.conn)
+        self._cache = {}
+        self._version = None
+
+    def _check_version(self):
+        version = data_version(self.conn)
+        if version != self._version:
+            built = self.conn.execute(
+                "SELECT built_version FROM aggregate_state WHERE name = 'brand_component_totals'"
+            ).fetchone()
+            if built is None or built[0] != version:
+                refresh_aggregates(self.conn)
+            self._cache.clear()
+            self._version = version
+
+    def rank_brands(self, component, impurity=None):
+        """
+        Brands of a component, lowest impurity first.
+
+        Parameters:
+            component (str): Component name (case-insensitive).
+            impurity (str): Rank by this impurity's ppm instead of the total.
+
+        Returns:
+            list of dict: brand, ppm (total or of `impurity`), and for total
+            rankings impurity_count, worst_impurity and worst_ppm.
+        """
+        self._check_version()
+        key = (component.casefold(), impurity.casefold() if impurity else None)
+        if key not in self._cache:
+            self._cache[key] = self._query(component, impurity)
+        return self._cache[key]
+
+    def _query(self, component, impurity):
+        if impurity is None:
+            rows = self.conn.execute(
+                '''SELECT b.name, t.total_ppm, t.impurity_count, i.name, t.worst_ppm
+                   FROM brand_component_totals t
+                   JOIN components c ON c.id = t.component_id
+                   JOIN brands b ON b.id = t.brand_id
+                   LEFT JOIN impurities i ON i.id = t.worst_impurity_id
+                   WHERE c.name = ? COLLATE NOCASE
+                   ORDER BY t.total_ppm, b.name''',
+                (component,),
+            ).fetchall()
+            return [
+                {"brand": brand, "ppm": total, "impurity_count": count, "worst_impurity": worst, "worst_ppm": worst_ppm}
+                for brand, total, count, worst, worst_ppm in rows
+            ]
+        # Brands that supply the component but do not list the impurity have 0 ppm of it
+        rows = self.conn.execute(
+            '''SELECT b.name, COALESCE(MAX(CASE WHEN i.name = ? COLLATE NOCASE THEN p.ppm END), 0) AS ppm
+               FROM raw_materials r
+               JOIN components c ON c.id = r.component_id
+               JOIN brands b ON b.id = r.brand_id
+               LEFT JOIN impurity_rows p ON p.id = r.id
+               LEFT JOIN impurities i ON i.id = p.impurity_id
+               WHERE c.name = ? COLLATE NOCASE
+               GROUP BY b.id
+               ORDER BY ppm, b.name''',
+            (impurity, component),
+        ).fetchall()
+        return [{"brand": brand, "ppm": ppm} for brand, ppm in rows]
+
+    def best_brand(self, component, impurity=None):
+        """The lowest-impurity brand of a component, or None if no brand supplies it."""
+        ranking = self.rank_brands(component, impurity)
+        return ranking[0] if ranking else None
+
+    def best_brands_for_recipe(self, mixture, impurity=None):
+        """
+        Best brand per component of a mixture (GUI file format).
+
+        A component's contribution to the finished mixture is its mole
+        fraction times the brand's ppm, so the best choice per component
+        is also the best for the recipe.
+
+        Returns:
+            dict: component -> {"brand", "ppm", "contribution_ppm"}, or None
+            for components no brand in the database supplies.
+        """
+        choice = {}
+        for component in mixture.get("components", []):
+            best = self.best_brand(component["name"], impurity)
+            choice[component["name"]] = best and {
+                "brand": best["brand"],
+                "ppm": best["ppm"],
+                "contribution_ppm": float(component["percentage"]) / 100 * best["ppm"],
+            }
+        return choice
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python brand_selection.py component [impurity]
+    selector = BrandSelector()
+    for rank in selector.rank_brands(*sys.argv[1:3]):
+        print(rank)
@@ -1,14 +1,15 @@
-import sqlite3
 import tkinter as tk
 from tkinter import messagebox
 
+from db_connection import close_all, get_connection
+
 class DatabaseApp:
     def __init__(self, root):
         self.root = root
         self.root.title('Impurities Database Gas Mix')
 
         # Connect to database
-        self.conn = sqlite3.connect('impurities.db')
+        self.conn = get_connection()
         self.cursor = self.conn.cursor()
 
         # Create table if not exists
@@ -59,10 +60,8 @@ class DatabaseApp:
         else:
             messagebox.showwarning("Warning", "Please select a task to delete.")
 
-    def __del__(self):
-        self.conn.close()
-
 if __name__ == "__main__":
     root = tk.Tk()
     app = DatabaseApp(root)
     root.mainloop()
+    close_all()
@@ -0,0 +1,56 @@
+import sqlite3
+import threading
+
+DB_FILE = 'impurities.db'
+
+# Applied to every new connection. WAL lets the viewer read while the loader
+# writes; NORMAL synchronous is safe with WAL and avoids an fsync per commit.
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",  # 16 MB page cache
+    "PRAGMA temp_store = MEMORY",
+]
+STATEMENT_CACHE_SIZE = 256  # Prepared statements kept per connection (keyed by SQL text)
+
+_local = threading.local()
+_lock = threading.Lock()
+_connections = []
+
+
+def get_connection(path=DB_FILE):
+    """
+    The long-lived connection of the calling thread to `path`.
+
+    The first call in a thread opens the connection and applies PRAGMAS;
+    later calls return the same connection, so callers should not close it.
+    Each worker thread gets its own connection (SQLite connections must not
+    be shared between threads), which together act as a small pool; with WAL
+    they read concurrently while one of them writes.
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        connections[path] = conn
+        with _lock:
+            _connections.append(conn)
+    return conn
+
+
+def close_all():
+    """Close the connections of all threads (at application exit)."""
+    with _lock:
+        for conn in _connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # Closed from another thread is not allowed; the process exit closes it
+        _connections.clear()
+    _local.__dict__.clear()
@@ -0,0 +1,136 @@
+import numpy as np
+
+from db_connection import get_connection
+from make_impurities_db import migrate
+
+
+class ImpurityMatrix:
+    """
+    Impurity content of every (component, brand) source in the database.
+
+    `ppm` has one row per source and one column per impurity. A batch of
+    recipes becomes a matrix of mole fractions over the same sources (each
+    component's fraction placed on the brand used for it), so the impurity
+    profiles of all recipes are one matrix product. The component's own
+    assay row is not an impurity and is left out (see the impurity_rows view
+    in make_impurities_db).
+    """
+
+    def __init__(self, sources, impurities, ppm):
+        self.sources = sources  # [(component, brand)]
+        self.impurities = impurities
+        self.ppm = ppm
+        self.source_index = {(c.casefold(), b.casefold()): s for s, (c, b) in enumerate(sources)}
+        self.brands_by_component = {}
+        for component, brand in sources:
+            self.brands_by_component.setdefault(component.casefold(), []).append(brand)
+
+    @classmethod
+    def from_db(cls, conn=None):
+        conn = conn or get_connection()
+        migrate(conn)
+        # A source that lists only its assay is still a source, with no impurities
+        sources = conn.execute(
+            '''SELECT DISTINCT c.name, b.name
+               FROM raw_materials r
+               JOIN components c ON c.id = r.component_id
+               JOIN brands b ON b.id = r.brand_id
+               ORDER BY c.name, b.name'''
+        ).fetchall()
+        rows = conn.execute(
+            '''SELECT c.name, b.name, i.name, r.ppm
+               FROM impurity_rows r
+               JOIN components c ON c.id = r.component_id
+               JOIN brands b ON b.id = r.brand_id
+               JOIN impurities i ON i.id = r.impurity_id
+               ORDER BY c.name, b.name, i.name'''
+        ).fetchall()
+        impurities = sorted({impurity for _, _, impurity, _ in rows})
+        source_index = {source: s for s, source in enumerate(sources)}
+        impurity_index = {impurity: i for i, impurity in enumerate(impurities)}
+
+        ppm = np.zeros((len(sources), len(impurities)))
+        if rows:
+            s = np.array([source_index[(component, brand)] for component, brand, _, _ in rows])
+            i = np.array([impurity_index[impurity] for _, _, impurity, _ in rows])
+            ppm[s, i] = [value for _, _, _, value in rows]
+        return cls(sources, impurities, ppm)
+
+    def _source(self, component, brand):
+        key = component.casefold()
+        brands = self.brands_by_component.get(key)
+        if not brands:
+            return None  # No impurity data for this component
+        if brand is None:
+            if len(brands) > 1:
+                raise ValueError(f"Choose a brand for {component} (available: {', '.join(brands)}).")
+            brand = brands[0]
+        try:
+            return self.source_index[(key, brand.casefold())]
+        except KeyError:
+            raise ValueError(f"No impurity data for {component} from {brand}.") from None
+
+    def source_fractions(self, mixtures, brands=None):
+        """
+        Mole fractions of many recipes over the sources.
+
+        Parameters:
+            mixtures (list of dict): Mixtures in the GUI file format. A mixture
+                may carry its own {"brands": {component: brand}}.
+            brands (dict): Component -> brand for all mixtures (a mixture's
+                own "brands" take precedence). A component supplied by a
+                single brand needs no entry.
+
+        Returns:
+            tuple: (n_mixtures, n_sources) array and, per mixture, the list of
+            components without impurity data.
+        """
+        brands = {k.casefold(): v for k, v in (brands or {}).items()}
+        fractions = np.zeros((len(mixtures), len(self.sources)))
+        missing = []
+        for row, mixture in enumerate(mixtures):
+            chosen = dict(brands, **{k.casefold(): v for k, v in mixture.get("brands", {}).items()})
+            missing.append([])
+            for component in mixture.get("components", []):
+                name = component["name"]
+                source = self._source(name, chosen.get(name.casefold()))
+                if source is None:
+                    missing[-1].append(name)
+                else:
+                    fractions[row, source] += float(component["percentage"]) / 100
+        return fractions, missing
+
+    def impurity_profiles(self, mixtures, brands=None):
+        """
+        Impurity content (ppm) that finished cylinders inherit from the raw
+        materials: mole fractions x source ppm, for a whole batch at once.
+
+        Returns:
+            dict: impurities (column names), ppm ((n_mixtures, n_impurities)
+            array) and missing (per mixture, components without data).
+        """
+        fractions, missing = self.source_fractions(mixtures, brands)
+        return {"impurities": self.impurities, "ppm": fractions @ self.ppm, "missing": missing}
+
+
+def certificate(profile_ppm, impurities, min_ppm=0.0):
+    """Impurity -> ppm of one mixture's profile row, largest first, above `min_ppm`."""
+    order = np.argsort(profile_ppm)[::-1]
+    return {impurities[i]: float(profile_ppm[i]) for i in order if profile_ppm[i] > min_ppm}
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    # Usage: python impurity_propagation.py mixture.json [...]  (mixtures with a "brands" dict)
+    matrix = ImpurityMatrix.from_db()
+    mixtures = []
+    for path in sys.argv[1:]:
+        with open(path, "r") as file:
+            mixtures.append(json.load(file))
+    profiles = matrix.impurity_profiles(mixtures)
+    for path, row, missing in zip(sys.argv[1:], profiles["ppm"], profiles["missing"]):
+        print(f"{path}:" + (f" (no impurity data for {', '.join(missing)})" if missing else ""))
+        for impurity, ppm in certificate(row, profiles["impurities"]).items():
+            print(f"{impurity:>25}: {ppm:10.3f} ppm")
@@ -1,25 +1,21 @@
-import sqlite3
 import csv
+import hashlib
 
-# Connect to the SQLite database (or create it if it doesn't exist)
-conn = sqlite3.connect('impurities.db')
-cursor = conn.cursor()
+from db_connection import DB_FILE, get_connection
 
 # Create the tables (if they don't already exist)
-cursor.execute('''CREATE TABLE IF NOT EXISTS brands (
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS brands (
                         id INTEGER PRIMARY KEY,
-                        name TEXT NOT NULL)''')
-
-cursor.execute('''CREATE TABLE IF NOT EXISTS components (
+                        name TEXT NOT NULL)''',
+    '''CREATE TABLE IF NOT EXISTS components (
                         id INTEGER PRIMARY KEY,
-                        name TEXT NOT NULL)''')
-
-cursor.execute('''CREATE TABLE IF NOT EXISTS impurities (
+                        name TEXT NOT NULL)''',
+    '''CREATE TABLE IF NOT EXISTS impurities (
                         id INTEGER PRIMARY KEY,
                         name TEXT NOT NULL,
-                        molar_mass REAL NOT NULL)''')
-
-cursor.execute('''CREATE TABLE IF NOT EXISTS raw_materials (
+                        molar_mass REAL NOT NULL)''',
+    '''CREATE TABLE IF NOT EXISTS raw_materials (
                         id INTEGER PRIMARY KEY,
                         brand_id INTEGER,
                         component_id INTEGER,
@@ -28,77 +24,305 @@ cursor.execute('''CREATE TABLE IF NOT EXISTS raw_materials (
                         mole_fraction REAL,
                         FOREIGN KEY(brand_id) REFERENCES brands(id),
                         FOREIGN KEY(component_id) REFERENCES components(id),
-                        FOREIGN KEY(impurity_id) REFERENCES impurities(id))''')
+                        FOREIGN KEY(impurity_id) REFERENCES impurities(id))''',
+]
+
+
+def create_tables(conn):
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+
+def deduplicate(conn):
+    """
+    Merge brands, components and impurities that share a name into the row
+    with the lowest id (re-pointing raw_materials), then drop raw_materials
+    rows that are exact copies of another row.
+
+    Returns:
+        dict: Number of rows removed per table.
+    """
+    removed = {}
+    for table, column in (('brands', 'brand_id'), ('components', 'component_id'), ('impurities', 'impurity_id')):
+        conn.execute(f'''UPDATE raw_materials SET {column} = (
+                              SELECT MIN(keep.id) FROM {table} keep JOIN {table} dup ON dup.name = keep.name
+                              WHERE dup.id = raw_materials.{column})
+                          WHERE {column} IN (SELECT id FROM {table}
+                                             WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY name))''')
+        removed[table] = conn.execute(
+            f'DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY name)'
+        ).rowcount
+    removed['raw_materials'] = conn.execute(
+        '''DELETE FROM raw_materials WHERE id NOT IN (
+               SELECT MIN(id) FROM raw_materials
+               GROUP BY brand_id, component_id, impurity_id, ppm, mole_fraction)'''
+    ).rowcount
+    return removed
+
+
+def _migrate_to_1(conn):
+    """Unique names (after de-duplication) and covering indexes for the raw_materials joins."""
+    deduplicate(conn)
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_brands_name ON brands(name)')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_components_name ON components(name)')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_impurities_name ON impurities(name)')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_raw_materials_component_brand
+                    ON raw_materials(component_id, brand_id, impurity_id, ppm, mole_fraction)''')
+    conn.execute('''CREATE INDEX IF NOT EXISTS idx_raw_materials_impurity
+                    ON raw_materials(impurity_id, component_id, brand_id)''')
+
+
+def _migrate_to_2(conn):
+    """
+    Aggregate table for brand selection (see brand_selection.py) and a data
+    version counter that triggers bump on every change the aggregates
+    depend on, so they know when to rebuild.
+    """
+    conn.execute('''CREATE TABLE IF NOT EXISTS data_version (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        version INTEGER NOT NULL)''')
+    conn.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)')
+    conn.execute('''CREATE TABLE IF NOT EXISTS brand_component_totals (
+                        component_id INTEGER NOT NULL,
+                        brand_id INTEGER NOT NULL,
+                        total_ppm REAL NOT NULL,
+                        impurity_count INTEGER NOT NULL,
+                        worst_impurity_id INTEGER,
+                        worst_ppm REAL,
+                        PRIMARY KEY (component_id, brand_id))''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS aggregate_state (
+                        name TEXT PRIMARY KEY,
+                        built_version INTEGER NOT NULL)''')
+    bump = 'UPDATE data_version SET version = version + 1 WHERE id = 1;'
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS raw_materials_{event.lower()}_version
+                         AFTER {event} ON raw_materials BEGIN {bump} END''')
+    # Renames change the names in cached rankings
+    for table in ('components', 'impurities'):
+        conn.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_rename_version
+                         AFTER UPDATE OF name ON {table} BEGIN {bump} END''')
+
+
+def row_hash(brand, component, impurity, ppm, mole_fraction):
+    """Hash of a source row (key and values), to detect changed rows on import."""
+    text = '\x1f'.join((brand, component, impurity, repr(float(ppm)), repr(float(mole_fraction))))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _migrate_to_3(conn):
+    """
+    Incremental imports: one raw_materials row per (brand, component,
+    impurity), keeping the most recently imported one; a hash of each row's
+    source values and the import batch that last wrote it.
+    """
+    conn.execute('''CREATE TABLE IF NOT EXISTS import_batches (
+                        id INTEGER PRIMARY KEY,
+                        source TEXT,
+                        imported_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        rows_read INTEGER,
+                        inserted INTEGER,
+                        updated INTEGER,
+                        unchanged INTEGER)''')
+    conn.execute('ALTER TABLE raw_materials ADD COLUMN row_hash TEXT')
+    conn.execute('ALTER TABLE raw_materials ADD COLUMN import_batch_id INTEGER REFERENCES import_batches(id)')
+    conn.execute('''DELETE FROM raw_materials WHERE id NOT IN (
+                        SELECT MAX(id) FROM raw_materials GROUP BY brand_id, component_id, impurity_id)''')
+    conn.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_raw_materials_key
+                    ON raw_materials(brand_id, component_id, impurity_id)''')
+    rows = conn.execute('''SELECT r.id, b.name, c.name, i.name, r.ppm, r.mole_fraction
+                            FROM raw_materials r
+                            JOIN brands b ON b.id = r.brand_id
+                            JOIN components c ON c.id = r.component_id
+                            JOIN impurities i ON i.id = r.impurity_id''').fetchall()
+    conn.executemany('UPDATE raw_materials SET row_hash = ? WHERE id = ?',
+                     [(row_hash(*values), row_id) for row_id, *values in rows])
+
+
+def _migrate_to_4(conn):
+    """
+    View of the raw_materials rows that are impurities. Each (component,
+    brand) source also lists its own assay, under whatever name the supplier
+    used ('CO' for carbon monoxide); it is the source's dominant row, so the
+    row with the highest ppm is left out rather than matching names
+    (replaced by migration 6).
+    """
+    conn.execute('''CREATE VIEW IF NOT EXISTS impurity_rows AS
+                    SELECT id, brand_id, component_id, impurity_id, ppm, mole_fraction
+                    FROM (SELECT r.*, ROW_NUMBER() OVER (
+                              PARTITION BY r.component_id, r.brand_id ORDER BY r.ppm DESC, r.id) AS rank
+                          FROM raw_materials r)
+                    WHERE rank > 1''')
+    # Aggregates built with the old name-matching detection are stale
+    conn.execute('DELETE FROM aggregate_state')
 
-# Helper function to insert data into the tables
-def insert_data_from_csv(csv_filename):
+
+def _migrate_to_5(conn):
+    """Brand renames also bump the data version; cached rankings hold brand names."""
+    conn.execute('''CREATE TRIGGER IF NOT EXISTS brands_rename_version
+                    AFTER UPDATE OF name ON brands
+                    BEGIN UPDATE data_version SET version = version + 1 WHERE id = 1; END''')
+
+
+ASSAY_MIN_PPM = 500000  # A source's top row is its assay only when it is the majority
+
+
+def _migrate_to_6(conn):
+    """
+    impurity_rows keeps a source's top row unless it is clearly the assay
+    (at least ASSAY_MIN_PPM), so partial sheets without an assay row keep
+    their worst impurity.
+    """
+    conn.execute('DROP VIEW IF EXISTS impurity_rows')
+    conn.execute(f'''CREATE VIEW impurity_rows AS
+                     SELECT id, brand_id, component_id, impurity_id, ppm, mole_fraction
+                     FROM (SELECT r.*, ROW_NUMBER() OVER (
+                               PARTITION BY r.component_id, r.brand_id ORDER BY r.ppm DESC, r.id) AS rank
+                           FROM raw_materials r)
+                     WHERE rank > 1 OR ppm < {ASSAY_MIN_PPM}''')
+    conn.execute('DELETE FROM aggregate_state')
+
+
+# Schema migrations in order; PRAGMA user_version holds the number applied
+MIGRATIONS = [_migrate_to_1, _migrate_to_2, _migrate_to_3, _migrate_to_4, _migrate_to_5, _migrate_to_6]
+
+
+def migrate(conn):
+    """
+    Bring the schema up to date: create missing tables and apply the
+    migrations newer than the database's user_version, each in its own
+    transaction. Returns the schema version.
+    """
+    create_tables(conn)
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= len(MIGRATIONS):
+        return len(MIGRATIONS)
+    # sqlite3 only opens implicit transactions before DML, so CREATE and ALTER
+    # would commit on their own; with explicit BEGIN a failed migration
+    # rolls back completely, user_version included.
+    conn.commit()
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            conn.execute('BEGIN')
+            try:
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {number}')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+    finally:
+        conn.isolation_level = isolation_level
+    return len(MIGRATIONS)
+
+
+def read_impurities_csv(csv_filename):
+    """
+    Read a supplier sheet in one pass.
+
+    Returns:
+        tuple: the rows as (brand, component, impurity, ppm, mole_fraction)
+        tuples, and dicts of the brand, component and impurity names (the
+        impurity names mapped to the first molar mass given for them).
+    """
+    rows = []
+    brands, components, impurities = {}, {}, {}
     with open(csv_filename, mode='r', encoding='utf-8-sig') as file:
-        reader = csv.DictReader(file)
-        
-        # # Print headers for debugging
-        # print("CSV Headers:", reader.fieldnames)
-        
-        # Insert brands into the 'brands' table
-        brands = set(row['brand_name'].strip() for row in reader)  # Strip spaces if needed
-        for brand in brands:
-            cursor.execute('INSERT OR IGNORE INTO brands (name) VALUES (?)', (brand,))
-        
-        # Rewind the file to start over
-        file.seek(0)
-        reader = csv.DictReader(file)
-
-        # Insert components into the 'components' table
-        components = set(row['component_name'].strip() for row in reader)  # Strip spaces if needed
-        for component in components:
-            cursor.execute('INSERT OR IGNORE INTO components (name) VALUES (?)', (component,))
-        
-        # Rewind the file to start over
-        file.seek(0)
-        reader = csv.DictReader(file)
-
-        # Insert impurities into the 'impurities' table
-        impurities = set(row['impurity_name'].strip() for row in reader)  # Strip spaces if needed
-        for impurity in impurities:
-            file.seek(0)  # Rewind again
-            reader = csv.DictReader(file)
-            molar_mass = next(r['molar_mass'] for r in reader if r['impurity_name'].strip() == impurity)
-            cursor.execute('INSERT OR IGNORE INTO impurities (name, molar_mass) VALUES (?, ?)', (impurity, molar_mass))
-        
-        # Rewind the file to start over
-        file.seek(0)
-        reader = csv.DictReader(file)
-
-        # Insert raw materials into the 'raw_materials' table
-        for row in reader:
+        for row in csv.DictReader(file):
             brand_name = row['brand_name'].strip()  # Strip spaces if needed
-            component_name = row['component_name'].strip()  # Strip spaces if needed
-            impurity_name = row['impurity_name'].strip()  # Strip spaces if needed
-            ppm = float(row['ppm'])
-            mole_fraction = float(row['mole_fraction'])
-            molar_mass = float(row['molar_mass'])
+            component_name = row['component_name'].strip()
+            impurity_name = row['impurity_name'].strip()
+            brands.setdefault(brand_name, None)
+            components.setdefault(component_name, None)
+            impurities.setdefault(impurity_name, float(row['molar_mass']))
+            rows.append((brand_name, component_name, impurity_name, float(row['ppm']), float(row['mole_fraction'])))
+    return rows, brands, components, impurities
 
-            # Get IDs for the relevant brand, component, and impurity
-            cursor.execute('SELECT id FROM brands WHERE name = ?', (brand_name,))
-            brand_id = cursor.fetchone()[0]
 
-            cursor.execute('SELECT id FROM components WHERE name = ?', (component_name,))
-            component_id = cursor.fetchone()[0]
+def _name_ids(cursor, table, names):
+    """
+    Name -> id of all `names` in `table`, inserting the missing ones.
+    `names` maps each name to its molar mass for the impurities table.
+    """
+    ids = dict(cursor.execute(f'SELECT name, id FROM {table}'))
+    missing = [name for name in names if name not in ids]
+    if table == 'impurities':
+        cursor.executemany('INSERT INTO impurities (name, molar_mass) VALUES (?, ?)',
+                           [(name, names[name]) for name in missing])
+    else:
+        cursor.executemany(f'INSERT INTO {table} (name) VALUES (?)', [(name,) for name in missing])
+    if missing:
+        ids = dict(cursor.execute(f'SELECT name, id FROM {table}'))
+    return ids
 
-            cursor.execute('SELECT id FROM impurities WHERE name = ?', (impurity_name,))
-            impurity_id = cursor.fetchone()[0]
 
-            # Insert the raw material data into the 'raw_materials' table
-            cursor.execute('''INSERT INTO raw_materials (brand_id, component_id, impurity_id, ppm, mole_fraction)
-                              VALUES (?, ?, ?, ?, ?)''', 
-                           (brand_id, component_id, impurity_id, ppm, mole_fraction))
+def insert_data_from_csv(csv_filename, conn):
+    """
+    Incrementally import a supplier sheet (database migrated to version 3).
+
+    The CSV is read once and each row hashed. Rows are keyed by (brand,
+    component, impurity); only keys that are new or whose hash differs from
+    the stored one are written, with one upsert executemany in a single
+    transaction, so re-importing an unchanged sheet writes nothing. The
+    import is recorded in import_batches and written rows carry its id.
+    Rows missing from the sheet are kept (sheets may be partial updates).
+
+    Returns:
+        dict: batch_id, rows_read, inserted, updated and unchanged.
+    """
+    rows, brands, components, impurities = read_impurities_csv(csv_filename)
+    with conn:
+        cursor = conn.cursor()
+        brand_ids = _name_ids(cursor, 'brands', brands)
+        component_ids = _name_ids(cursor, 'components', components)
+        impurity_ids = _name_ids(cursor, 'impurities', impurities)
+
+        records = {}  # key -> (ppm, mole_fraction, hash); a later row of the sheet wins
+        for brand, component, impurity, ppm, mole_fraction in rows:
+            key = (brand_ids[brand], component_ids[component], impurity_ids[impurity])
+            records[key] = (ppm, mole_fraction, row_hash(brand, component, impurity, ppm, mole_fraction))
+
+        stored = {}
+        for component_id in {key[1] for key in records}:
+            cursor.execute('SELECT brand_id, component_id, impurity_id, row_hash FROM raw_materials '
+                           'WHERE component_id = ?', (component_id,))
+            stored.update(((b, c, i), h) for b, c, i, h in cursor.fetchall())
+        changed = [key for key, record in records.items() if stored.get(key) != record[2]]
+        inserted = sum(key not in stored for key in changed)
+
+        cursor.execute('INSERT INTO import_batches (source, rows_read) VALUES (?, ?)', (csv_filename, len(rows)))
+        batch_id = cursor.lastrowid
+        cursor.executemany(
+            '''INSERT INTO raw_materials
+                   (brand_id, component_id, impurity_id, ppm, mole_fraction, row_hash, import_batch_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(brand_id, component_id, impurity_id) DO UPDATE SET
+                   ppm = excluded.ppm,
+                   mole_fraction = excluded.mole_fraction,
+                   row_hash = excluded.row_hash,
+                   import_batch_id = excluded.import_batch_id''',
+            [(*key, *records[key], batch_id) for key in changed],
+        )
+        summary = {
+            "batch_id": batch_id,
+            "rows_read": len(rows),
+            "inserted": inserted,
+            "updated": len(changed) - inserted,
+            "unchanged": len(records) - len(changed),
+        }
+        cursor.execute('UPDATE import_batches SET inserted = ?, updated = ?, unchanged = ? WHERE id = ?',
+                       (summary["inserted"], summary["updated"], summary["unchanged"], batch_id))
+    return summary
 
-    # Commit changes and close the connection
-    conn.commit()
 
-# Insert data from the CSV file
-insert_data_from_csv('impurities.csv')
+if __name__ == "__main__":
+    # Connect to the SQLite database (or create it if it doesn't exist)
+    conn = get_connection(DB_FILE)
+    migrate(conn)
 
-# Close the connection
-conn.close()
+    # Insert new and changed rows from the CSV file
+    summary = insert_data_from_csv('impurities.csv', conn)
 
-print("Data inserted successfully from CSV.")
+    print(f"Data imported from CSV (batch {summary['batch_id']}): {summary['inserted']} inserted, "
+          f"{summary['updated']} updated, {summary['unchanged']} unchanged.")
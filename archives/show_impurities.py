@@ -2,57 +2,112 @@ import sqlite3
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-# Function to get data from the database
-def fetch_data_from_db():
-    # Connect to the SQLite database
-    conn = sqlite3.connect('impurities.db')
-    cursor = conn.cursor()
+from db_connection import close_all, get_connection
 
-    # Fetch data from each table
-    cursor.execute("SELECT * FROM brands")
-    brands_data = cursor.fetchall()
+PAGE_SIZE = 200  # Rows fetched per page
+PREFETCH_AT = 0.9  # Fetch the next page when scrolled past this fraction
 
-    cursor.execute("SELECT * FROM components")
-    components_data = cursor.fetchall()
-
-    cursor.execute("SELECT * FROM impurities")
-    impurities_data = cursor.fetchall()
-
-    cursor.execute("SELECT * FROM raw_materials")
-    raw_materials_data = cursor.fetchall()
-
-    # Close the connection
-    conn.close()
-
-    return brands_data, components_data, impurities_data, raw_materials_data
+# Columns shown per table; the first is always the id. raw_materials is shown
+# joined with the brand, component and impurity names instead of their ids.
+columns_mapping = {
+    'brands': ["ID", "Brand Name"],
+    'components': ["ID", "Component Name"],
+    'impurities': ["ID", "Impurity Name", "Molar Mass"],
+    'raw_materials': ["ID", "Brand", "Component", "Impurity", "PPM", "Mole Fraction"]
+}
 
-# Function to populate treeview with the data
-def populate_treeview(treeview, data, columns):
-    # Clear existing rows
-    for row in treeview.get_children():
-        treeview.delete(row)
-    
-    # Insert new rows
-    for row in data:
-        treeview.insert("", "end", values=row)
+select_queries = {
+    'brands': "SELECT id, name FROM brands",
+    'components': "SELECT id, name FROM components",
+    'impurities': "SELECT id, name, molar_mass FROM impurities",
+    'raw_materials': '''SELECT r.id, b.name, c.name, i.name, r.ppm, r.mole_fraction
+                        FROM raw_materials r
+                        LEFT JOIN brands b ON b.id = r.brand_id
+                        LEFT JOIN components c ON c.id = r.component_id
+                        LEFT JOIN impurities i ON i.id = r.impurity_id''',
+}
+id_columns = {'brands': 'id', 'components': 'id', 'impurities': 'id', 'raw_materials': 'r.id'}
+# raw_materials column referencing each name table (its tab shows the names)
+reference_columns = {'brands': 'brand_id', 'components': 'component_id', 'impurities': 'impurity_id'}
+
+
+# Keyset pagination: the next page starts after the last id shown, so a page
+# costs the same wherever it is in the table (no OFFSET scan).
+def fetch_page(table_name, after_id=0, limit=PAGE_SIZE):
+    id_column = id_columns[table_name]
+    cursor = get_connection().execute(
+        f"{select_queries[table_name]} WHERE {id_column} > ? ORDER BY {id_column} LIMIT ?", (after_id, limit)
+    )
+    return cursor.fetchall()
+
+# Function to fetch a single row (after an edit)
+def fetch_row(table_name, row_id):
+    id_column = id_columns[table_name]
+    cursor = get_connection().execute(f"{select_queries[table_name]} WHERE {id_column} = ?", (row_id,))
+    return cursor.fetchone()
+
+class PagedTable:
+    """Treeview that loads its table page by page as the user scrolls down."""
+
+    def __init__(self, tree, scrollbar, table_name):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.table_name = table_name
+        self.last_id = 0
+        self.exhausted = False
+        tree.configure(yscrollcommand=self.on_scroll)
+
+    def load_next_page(self):
+        if self.exhausted:
+            return
+        rows = fetch_page(self.table_name, self.last_id)
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[0]), values=row)
+        if rows:
+            self.last_id = rows[-1][0]
+        self.exhausted = len(rows) < PAGE_SIZE
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= PREFETCH_AT and not self.exhausted:
+            # after_idle: inserting rows from inside the scroll callback re-enters it
+            self.tree.after_idle(self.load_next_page)
+
+    def refresh_row(self, row_id):
+        row = fetch_row(self.table_name, row_id)
+        if row is None:
+            self.tree.delete(str(row_id))
+        else:
+            self.tree.item(str(row_id), values=row)
+
+    def refresh_references(self, table_name, row_id):
+        """Re-fetch the loaded raw_materials rows that show the name of `row_id` in `table_name`."""
+        cursor = get_connection().execute(
+            f"SELECT id FROM raw_materials WHERE {reference_columns[table_name]} = ? AND id <= ?",
+            (row_id, self.last_id),
+        )
+        for (raw_material_id,) in cursor.fetchall():
+            if self.tree.exists(str(raw_material_id)):
+                self.refresh_row(raw_material_id)
 
 # Function to edit a selected row
-def edit_selected_row(treeview, table_name):
-    selected_item = treeview.selection()
+def edit_selected_row(paged_table):
+    tree, table_name = paged_table.tree, paged_table.table_name
+    selected_item = tree.selection()
     if not selected_item:
         messagebox.showwarning("Selection Error", "Please select a row to edit.")
         return
 
     # Get the current data of the selected row
-    row_data = treeview.item(selected_item)['values']
-    
+    row_data = tree.item(selected_item)['values']
+
     # Open a new window for editing
     edit_window = tk.Toplevel(root)
     edit_window.title(f"Edit {table_name} Entry")
 
-    # Create labels and entries for each column
+    # Create labels and entries for each column (the id is not editable)
     entries = {}
-    for i, col in enumerate(columns_mapping[table_name]):
+    for i, col in enumerate(columns_mapping[table_name][1:], start=1):
         label = tk.Label(edit_window, text=col)
         label.grid(row=i, column=0, padx=10, pady=5)
 
@@ -63,10 +118,16 @@ def edit_selected_row(treeview, table_name):
 
     def save_changes():
         # Collect the new values from the entries
-        new_data = [entries[col].get() for col in columns_mapping[table_name]]
+        new_data = [entries[col].get() for col in columns_mapping[table_name][1:]]
         if validate_data(new_data, table_name):
-            update_data_in_db(new_data, row_data, table_name)
-            populate_treeview(treeview, fetch_data_from_db()[table_name_mapping[table_name]], columns_mapping[table_name])
+            try:
+                update_data_in_db(new_data, row_data, table_name)
+            except (sqlite3.IntegrityError, ValueError) as e:
+                messagebox.showwarning("Input Error", str(e))
+                return
+            paged_table.refresh_row(row_data[0])
+            if table_name in reference_columns:
+                paged_tables['raw_materials'].refresh_references(table_name, row_data[0])
             edit_window.destroy()
 
     save_button = tk.Button(edit_window, text="Save", command=save_changes)
@@ -80,11 +141,13 @@ def validate_data(data, table_name):
         return False
     return True
 
-# Function to update data in the database
+# Function to update data in the database; new_data holds the editable columns
 def update_data_in_db(new_data, old_data, table_name):
-    conn = sqlite3.connect('impurities.db')
-    cursor = conn.cursor()
+    conn = get_connection()
+    with conn:
+        _update_row(conn.cursor(), new_data, old_data, table_name)
 
+def _update_row(cursor, new_data, old_data, table_name):
     if table_name == 'brands':
         cursor.execute("UPDATE brands SET name = ? WHERE id = ?", (new_data[0], old_data[0]))
     elif table_name == 'components':
@@ -92,33 +155,45 @@ def update_data_in_db(new_data, old_data, table_name):
     elif table_name == 'impurities':
         cursor.execute("UPDATE impurities SET name = ?, molar_mass = ? WHERE id = ?", (new_data[0], new_data[1], old_data[0]))
     elif table_name == 'raw_materials':
+        # The joined view shows names; look up their ids
+        ids = []
+        for table, name in zip(('brands', 'components', 'impurities'), new_data[:3]):
+            cursor.execute(f"SELECT id FROM {table} WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            if row is None:
+                raise ValueError(f"Unknown {table[:-1]}: {name}")
+            ids.append(row[0])
         cursor.execute("UPDATE raw_materials SET brand_id = ?, component_id = ?, impurity_id = ?, ppm = ?, mole_fraction = ? WHERE id = ?",
-                       (new_data[0], new_data[1], new_data[2], new_data[3], new_data[4], old_data[0]))
-    
-    conn.commit()
-    conn.close()
+                       (*ids, new_data[3], new_data[4], old_data[0]))
 
 # Function to delete selected row
-def delete_selected_row(treeview, table_name):
-    selected_item = treeview.selection()
+def delete_selected_row(paged_table):
+    tree, table_name = paged_table.tree, paged_table.table_name
+    selected_item = tree.selection()
     if not selected_item:
         messagebox.showwarning("Selection Error", "Please select a row to delete.")
         return
 
     # Get the ID of the selected row
-    row_data = treeview.item(selected_item)['values']
+    row_data = tree.item(selected_item)['values']
     row_id = row_data[0]
 
     # Ask for confirmation before deleting
     if messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete row with ID {row_id}?"):
-        delete_data_from_db(row_id, table_name)
-        populate_treeview(treeview, fetch_data_from_db()[table_name_mapping[table_name]], columns_mapping[table_name])
+        try:
+            delete_data_from_db(row_id, table_name)
+        except sqlite3.IntegrityError:
+            messagebox.showwarning("Delete Error", f"Row {row_id} is still used by raw materials.")
+            return
+        tree.delete(selected_item)
 
 # Function to delete data from the database
 def delete_data_from_db(row_id, table_name):
-    conn = sqlite3.connect('impurities.db')
-    cursor = conn.cursor()
+    conn = get_connection()
+    with conn:
+        _delete_row(conn.cursor(), row_id, table_name)
 
+def _delete_row(cursor, row_id, table_name):
     if table_name == 'brands':
         cursor.execute("DELETE FROM brands WHERE id = ?", (row_id,))
     elif table_name == 'components':
@@ -127,40 +202,20 @@ def delete_data_from_db(row_id, table_name):
         cursor.execute("DELETE FROM impurities WHERE id = ?", (row_id,))
     elif table_name == 'raw_materials':
         cursor.execute("DELETE FROM raw_materials WHERE id = ?", (row_id,))
-    
-    conn.commit()
-    conn.close()
-
-# Create the main application window
-root = tk.Tk()
-root.title("Impurities Database Viewer")
-
-# Frame for displaying tables
-frame = tk.Frame(root)
-frame.pack(fill=tk.BOTH, expand=True)
-
-# Tab Control for separating the tables
-tab_control = ttk.Notebook(frame)
-
-# Create tabs for each table
-tab_brands = ttk.Frame(tab_control)
-tab_components = ttk.Frame(tab_control)
-tab_impurities = ttk.Frame(tab_control)
-tab_raw_materials = ttk.Frame(tab_control)
-
-tab_control.add(tab_brands, text="Brands")
-tab_control.add(tab_components, text="Components")
-tab_control.add(tab_impurities, text="Impurities")
-tab_control.add(tab_raw_materials, text="Raw Materials")
-tab_control.pack(expand=True, fill="both")
 
 # Treeview widget for displaying the data
 def create_treeview(parent, columns, table_name):
-    tree = ttk.Treeview(parent, columns=columns, show="headings")
+    tree_frame = tk.Frame(parent)
+    tree_frame.pack(fill=tk.BOTH, expand=True)
+
+    tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
     for col in columns:
         tree.heading(col, text=col)
         tree.column(col, width=150)
-    tree.pack(fill=tk.BOTH, expand=True)
+    scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    paged_table = PagedTable(tree, scrollbar, table_name)
 
     # Add context menu for editing and deleting
     def on_treeview_select(event):
@@ -175,45 +230,37 @@ def create_treeview(parent, columns, table_name):
     buttons_frame = tk.Frame(parent)
     buttons_frame.pack(fill=tk.X, padx=10, pady=5)
 
-    edit_button = tk.Button(buttons_frame, text="Edit", command=lambda: edit_selected_row(tree, table_name))
+    edit_button = tk.Button(buttons_frame, text="Edit", command=lambda: edit_selected_row(paged_table))
     edit_button.pack(side=tk.LEFT, padx=5)
 
-    delete_button = tk.Button(buttons_frame, text="Delete", command=lambda: delete_selected_row(tree, table_name))
+    delete_button = tk.Button(buttons_frame, text="Delete", command=lambda: delete_selected_row(paged_table))
     delete_button.pack(side=tk.LEFT, padx=5)
 
-    return tree
-
-# Column mappings for each table
-columns_mapping = {
-    'brands': ["ID", "Brand Name"],
-    'components': ["ID", "Component Name"],
-    'impurities': ["ID", "Impurity Name", "Molar Mass"],
-    'raw_materials': ["ID", "Brand ID", "Component ID", "Impurity ID", "PPM", "Mole Fraction"]
-}
-
-# Mapping table names to fetch data correctly
-table_name_mapping = {
-    'brands': 0,
-    'components': 1,
-    'impurities': 2,
-    'raw_materials': 3
-}
-
-# Fetch the data from the database
-brands_data, components_data, impurities_data, raw_materials_data = fetch_data_from_db()
-
-# Create treeviews for each tab and populate them
-brands_treeview = create_treeview(tab_brands, columns_mapping['brands'], 'brands')
-populate_treeview(brands_treeview, brands_data, columns_mapping['brands'])
-
-components_treeview = create_treeview(tab_components, columns_mapping['components'], 'components')
-populate_treeview(components_treeview, components_data, columns_mapping['components'])
-
-impurities_treeview = create_treeview(tab_impurities, columns_mapping['impurities'], 'impurities')
-populate_treeview(impurities_treeview, impurities_data, columns_mapping['impurities'])
-
-raw_materials_treeview = create_treeview(tab_raw_materials, columns_mapping['raw_materials'], 'raw_materials')
-populate_treeview(raw_materials_treeview, raw_materials_data, columns_mapping['raw_materials'])
-
-# Start the Tkinter event loop
-root.mainloop()
+    return paged_table
+
+if __name__ == "__main__":
+    # Create the main application window
+    root = tk.Tk()
+    root.title("Impurities Database Viewer")
+
+    # Frame for displaying tables
+    frame = tk.Frame(root)
+    frame.pack(fill=tk.BOTH, expand=True)
+
+    # Tab Control for separating the tables
+    tab_control = ttk.Notebook(frame)
+
+    # Create tabs for each table, loading the first page of each
+    tab_titles = {'brands': "Brands", 'components': "Components",
+                  'impurities': "Impurities", 'raw_materials': "Raw Materials"}
+    paged_tables = {}
+    for table_name, title in tab_titles.items():
+        tab = ttk.Frame(tab_control)
+        tab_control.add(tab, text=title)
+        paged_tables[table_name] = create_treeview(tab, columns_mapping[table_name], table_name)
+        paged_tables[table_name].load_next_page()
+    tab_control.pack(expand=True, fill="both")
+
+    # Start the Tkinter event loop
+    root.mainloop()
+    close_all()
@@ -0,0 +1,126 @@
+import argparse
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from recipe_defaults import CONFIG_FILE
+from recipe_engine import load_recipe
+
+REPORT_COLUMNS = [
+    "file", "component", "formula", "percentage", "molar_mass", "weight",
+    "z_mix", "total_moles", "total_weight", "error",
+]
+
+_components = {}
+
+
+def _init_worker(components):
+    global _components
+    _components = components
+
+
+def is_mixture_file(file_path):
+    """
+    False for JSON files without a "components" list (e.g.
+    components_config.json). Unreadable files count as mixtures, so the
+    batch reports their error.
+    """
+    try:
+        with open(file_path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return True
+    return isinstance(data, dict) and isinstance(data.get("components"), list)
+
+
+def find_mixture_files(patterns):
+    """Expand directories, globs and plain paths into a sorted list of mixture files."""
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.update(glob.glob(os.path.join(pattern, "*.json")))
+        else:
+            files.update(glob.glob(pattern) or [pattern])
+    return sorted(file for file in files if is_mixture_file(file))
+
+
+def compute_mixture_file(file_path):
+    """
+    Compute the recipe of one mixture file and return its report rows.
+    Results cached in the file are reused when its hash and engine version
+    still match.
+
+    Errors (unreadable file, fractions not summing to 1, unknown component)
+    are reported as a single row with the error message instead of stopping
+    the batch.
+    """
+    try:
+        with open(file_path, "r") as f:
+            recipe = load_recipe(json.load(f), _components)
+    except Exception as e:
+        return [{"file": file_path, "error": f"{type(e).__name__}: {e}"}]
+
+    return [
+        {
+            "file": file_path,
+            "component": row["name"],
+            "formula": row["formula"],
+            "percentage": row["mole_fraction"] * 100,
+            "molar_mass": row["molar_mass"],
+            "weight": row["weight"],
+            "z_mix": recipe["z_mix"],
+            "total_moles": recipe["total_moles"],
+            "total_weight": recipe["total_weight"],
+            "error": "",
+        }
+        for row in recipe["components"]
+    ]
+
+
+def run_batch(files, components, workers=None):
+    """Compute all mixture files on a process pool and return the report as a DataFrame."""
+    if workers == 1:
+        _init_worker(components)
+        results = map(compute_mixture_file, files)
+        rows = [row for file_rows in results for row in file_rows]
+    else:
+        workers = workers or os.cpu_count()
+        chunksize = max(1, len(files) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(components,)) as pool:
+            rows = [row for file_rows in pool.map(compute_mixture_file, files, chunksize=chunksize) for row in file_rows]
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def write_report(report, output):
+    if output.endswith(".parquet"):
+        report.to_parquet(output, index=False)
+    else:
+        report.to_csv(output, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute component weights for many saved mixture files.")
+    parser.add_argument("inputs", nargs="+", help="Mixture JSON files, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="recipe_report.csv", help="Report file (.csv or .parquet)")
+    parser.add_argument("-c", "--components", default=CONFIG_FILE, help="Component name -> formula JSON file")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    files = find_mixture_files(args.inputs)
+    if not files:
+        parser.error("no mixture files found")
+    with open(args.components, "r") as f:
+        components = json.load(f)
+
+    report = run_batch(files, components, args.workers)
+    write_report(report, args.output)
+
+    failed = report.loc[report["error"] != "", "file"].nunique()
+    print(f"Processed {len(files)} mixture files ({failed} failed), report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,128 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
+import chemicals
 from chemicals.identifiers import CAS_from_any
 
-def get_CAS(chemical_name):
-    """
-    Retrieve CAS RN for a given chemical name using the chemicals library.
-    """
+CAS_CACHE_FILE = "cas_cache.json"
+
+FOUND, NOT_FOUND, ERROR = "found", "not found", "error"
+
+
+def normalize_name(name):
+    """Strip and collapse whitespace. Case is kept, because formulas such as CO and Co differ."""
+    return " ".join(str(name).split())
+
+
+def _lookup(name):
+    """Worker: (name, status, CAS RN or error message)."""
     try:
-        cas_rn = CAS_from_any(chemical_name)
-        if cas_rn:
-            return cas_rn
-        return "CAS RN not found"
+        cas_rn = CAS_from_any(name)
+    except ValueError:
+        return name, NOT_FOUND, None  # chemicals raises ValueError for unknown identifiers
     except Exception as e:
-        return f"Error: {e}"
+        return name, ERROR, f"{type(e).__name__}: {e}"
+    return (name, FOUND, cas_rn) if cas_rn else (name, NOT_FOUND, None)
+
+
+def load_cache(cache_file=CAS_CACHE_FILE):
+    """
+    Name -> CAS RN (None for names chemicals does not know). Not-found entries
+    are dropped when the chemicals version changed, so they are retried.
+    """
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file, "r") as file:
+        cache = json.load(file)
+    names = cache.get("names", {})
+    if cache.get("chemicals_version") != chemicals.__version__:
+        names = {name: cas_rn for name, cas_rn in names.items() if cas_rn}
+    return names
+
+
+def save_cache(names, cache_file=CAS_CACHE_FILE):
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, "w") as file:
+        json.dump({"chemicals_version": chemicals.__version__, "names": names}, file, indent=1, sort_keys=True)
+    os.replace(tmp_file, cache_file)
+
+
+def resolve_cas(names, cache_file=CAS_CACHE_FILE, workers=None):
+    """
+    Resolve many component names to CAS numbers.
+
+    Names are normalized and deduplicated; the on-disk cache is checked first
+    and only the misses are looked up, in parallel on a process pool. Found
+    and not-found results are added to the cache, errors are not (they are
+    retried on the next run).
+
+    Parameters:
+        names (iterable of str): Component names, duplicates allowed.
+        cache_file (str): JSON cache file, or None to disable the cache.
+        workers (int): Worker processes (default: all cores; 1 runs serially).
+
+    Returns:
+        dict: normalized name -> (status, CAS RN or error message), with
+        status FOUND, NOT_FOUND or ERROR.
+    """
+    unique = {normalize_name(name) for name in names if isinstance(name, str) and name.strip()}
+    cache = load_cache(cache_file) if cache_file else {}
+    results = {name: (FOUND, cache[name]) if cache[name] else (NOT_FOUND, None)
+               for name in unique if name in cache}
+    misses = sorted(unique.difference(results))
+
+    if misses:
+        if workers == 1:
+            lookups = list(map(_lookup, misses))
+        else:
+            workers = workers or os.cpu_count()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                lookups = list(pool.map(_lookup, misses, chunksize=max(1, len(misses) // (4 * workers))))
+        for name, status, value in lookups:
+            results[name] = (status, value)
+            if status != ERROR:
+                cache[name] = value
+        if cache_file:
+            save_cache(cache, cache_file)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add CAS numbers to a CSV of component names.")
+    parser.add_argument("input", nargs="?", default=os.path.join("archives", "chemprop.csv"),
+                        help="CSV with a 'component_name' column")
+    parser.add_argument("-o", "--output", default="chemprop_with_cas.csv", help="Output CSV file")
+    parser.add_argument("--cache", default=CAS_CACHE_FILE, help="CAS cache file")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.input, encoding="utf-8-sig")
 
-# Load the CSV file
-input_file = "chemprop.csv"  # Replace with your file name
-output_file = "chemprop_with_cas.csv"  # Output file name
-df = pd.read_csv(input_file)
+    # Ensure the input file has the correct column
+    if "component_name" not in df.columns:
+        raise ValueError("The input CSV must have a column named 'component_name'.")
 
-# Ensure the input file has the correct column
-if "component_name" not in df.columns:
-    raise ValueError("The input CSV must have a column named 'component_name'.")
+    results = resolve_cas(df["component_name"], args.cache, args.workers)
+    resolved = df["component_name"].map(
+        lambda name: results.get(normalize_name(name), (NOT_FOUND, None)) if isinstance(name, str) else (NOT_FOUND, None)
+    )
+    df["CAS RN"] = [value if status == FOUND else "" for status, value in resolved]
+    df["CAS status"] = [status for status, _ in resolved]
+    df["CAS error"] = [value if status == ERROR else "" for status, value in resolved]
+    df.to_csv(args.output, index=False)
 
-# Process each component and fetch CAS RN
-df["CAS RN"] = df["component_name"].apply(get_CAS)
+    not_found = sorted(name for name, (status, _) in results.items() if status == NOT_FOUND)
+    errors = sorted(name for name, (status, _) in results.items() if status == ERROR)
+    print(f"Processed data saved to {args.output}: {len(results)} distinct names, "
+          f"{len(results) - len(not_found) - len(errors)} found, {len(not_found)} not found, {len(errors)} errors")
+    if not_found:
+        print("Not found:", ", ".join(not_found))
+    for name in errors:
+        print(f"Error for {name}: {results[name][1]}")
 
-# Save the updated DataFrame to a new CSV file
-df.to_csv(output_file, index=False)
 
-print(f"Processed data saved to {output_file}")
-print(df.head())  # Display the first few rows of the updated DataFrame
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+
+from recipe_defaults import CATALOGUE_FILE, CONFIG_FILE, MATERIAL_CAS_FILE
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS components (
+           id INTEGER PRIMARY KEY,
+           name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+           formula TEXT,
+           cas TEXT,
+           mw REAL,
+           tc REAL,
+           pc REAL,
+           omega REAL,
+           preset INTEGER NOT NULL DEFAULT 0)''',
+    '''CREATE TABLE IF NOT EXISTS aliases (
+           alias TEXT PRIMARY KEY COLLATE NOCASE,
+           component_id INTEGER NOT NULL REFERENCES components(id) ON DELETE CASCADE)''',
+    'CREATE INDEX IF NOT EXISTS idx_components_formula ON components(formula)',
+    'CREATE INDEX IF NOT EXISTS idx_components_cas ON components(cas)',
+    'CREATE INDEX IF NOT EXISTS idx_aliases_component ON aliases(component_id)',
+]
+
+
+def _like_prefix(prefix):
+    """LIKE pattern matching names that start with `prefix` (wildcards escaped)."""
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+class ComponentCatalogue:
+    """
+    SQLite catalogue of components: name, aliases, formula, CAS, molar mass,
+    critical temperature (K), critical pressure (Pa) and acentric factor.
+
+    Names and aliases are case-insensitive (NOCASE) and indexed, so prefix
+    searches for the component combobox use the index instead of scanning.
+    Each thread gets its own connection, so the GUI thread and the
+    calculation worker can both use one catalogue object.
+    """
+
+    def __init__(self, path=CATALOGUE_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self.connection as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    @property
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def is_empty(self):
+        return self.connection.execute("SELECT 1 FROM components LIMIT 1").fetchone() is None
+
+    # --- Writing ---
+
+    def add_component(self, name, formula=None, cas=None, mw=None, tc=None, pc=None, omega=None,
+                      aliases=(), preset=False):
+        """
+        Insert or update one component; existing values are kept where the new
+        ones are missing. Returns the component id.
+        """
+        with self.connection as conn:
+            return self._add(conn, name, formula, cas, mw, tc, pc, omega, aliases, preset)
+
+    @staticmethod
+    def _add(conn, name, formula=None, cas=None, mw=None, tc=None, pc=None, omega=None, aliases=(), preset=False):
+        """`add_component` without committing, so imports can run in one transaction."""
+        name = name.strip().upper()
+        conn.execute(
+            '''INSERT INTO components (name, formula, cas, mw, tc, pc, omega, preset)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(name) DO UPDATE SET
+                   formula = coalesce(excluded.formula, formula),
+                   cas = coalesce(excluded.cas, cas),
+                   mw = coalesce(excluded.mw, mw),
+                   tc = coalesce(excluded.tc, tc),
+                   pc = coalesce(excluded.pc, pc),
+                   omega = coalesce(excluded.omega, omega),
+                   preset = max(preset, excluded.preset)''',
+            (name, formula, cas, mw, tc, pc, omega, int(preset)),
+        )
+        component_id = conn.execute("SELECT id FROM components WHERE name = ?", (name,)).fetchone()[0]
+        conn.executemany(
+            "INSERT OR IGNORE INTO aliases (alias, component_id) VALUES (?, ?)",
+            [(alias, component_id) for alias in aliases if alias and alias.upper() != name],
+        )
+        return component_id
+
+    def import_config(self, json_file=CONFIG_FILE):
+        """Import a name -> formula JSON file (components_config.json) as preset components."""
+        with open(json_file, "r") as file:
+            components = json.load(file)
+        with self.connection as conn:
+            for name, formula in components.items():
+                self._add(conn, name, formula=formula, aliases=[formula], preset=True)
+
+    def import_material_cas(self, csv_file=MATERIAL_CAS_FILE):
+        """Import component names and CAS numbers from archives/materialcas.csv."""
+        with open(csv_file, mode="r", encoding="utf-8-sig") as file:
+            rows = list(csv.DictReader(file))
+        with self.connection as conn:
+            for row in rows:
+                self._add(conn, row["component_name"], cas=row["CAS RN"].strip() or None)
+
+    def fill_properties(self):
+        """
+        Look up missing CAS, formula, MW, Tc, Pc and omega through `chemicals`.
+        Run once after an import; components `chemicals` does not know are skipped.
+        """
+        from chemicals import CAS_from_any, Tc, Pc, omega
+        from chemicals.identifiers import search_chemical
+
+        rows = self.connection.execute(
+            '''SELECT id, name, formula, cas FROM components
+               WHERE cas IS NULL OR formula IS NULL OR mw IS NULL
+                  OR tc IS NULL OR pc IS NULL OR omega IS NULL'''
+        ).fetchall()
+        with self.connection as conn:
+            for row in rows:
+                try:
+                    cas = row["cas"] or CAS_from_any(row["formula"] or row["name"])
+                    metadata = search_chemical(cas)
+                except Exception:
+                    continue
+                self._add(
+                    conn, row["name"], formula=row["formula"] or metadata.formula, cas=cas, mw=metadata.MW,
+                    tc=Tc(cas), pc=Pc(cas), omega=omega(cas),
+                    aliases=[metadata.common_name, metadata.formula],
+                )
+
+    def initialize(self, json_file=CONFIG_FILE, csv_file=MATERIAL_CAS_FILE, fill_properties=True):
+        """
+        One-time import of the JSON configuration and the CAS list into an empty
+        catalogue. Returns True if the import ran, False if the catalogue already had data.
+        """
+        if not self.is_empty():
+            return False
+        if os.path.exists(json_file):
+            self.import_config(json_file)
+        if os.path.exists(csv_file):
+            self.import_material_cas(csv_file)
+        if fill_properties:
+            self.fill_properties()
+        return True
+
+    # --- Reading ---
+
+    def search(self, prefix, limit=20):
+        """Component names whose name or an alias starts with `prefix`, case-insensitive."""
+        pattern = _like_prefix(prefix.strip())
+        rows = self.connection.execute(
+            '''SELECT name FROM components WHERE name LIKE ? ESCAPE '\\'
+               UNION
+               SELECT c.name FROM aliases a JOIN components c ON c.id = a.component_id
+               WHERE a.alias LIKE ? ESCAPE '\\'
+               ORDER BY name LIMIT ?''',
+            (pattern, pattern, limit),
+        ).fetchall()
+        return [row["name"] for row in rows]
+
+    def get(self, name):
+        """Catalogue entry of a component by name or alias as a dict, or None."""
+        row = self.connection.execute(
+            '''SELECT * FROM components WHERE name = ?
+               UNION ALL
+               SELECT c.* FROM aliases a JOIN components c ON c.id = a.component_id WHERE a.alias = ?
+               LIMIT 1''',
+            (name, name),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def critical_properties(self, component):
+        """
+        (Tc, Pc, omega) of a component, or None if not stored. Names match
+        before aliases and aliases before formulas, since isomers share a
+        formula.
+        """
+        row = self.connection.execute(
+            '''SELECT tc, pc, omega, 0 AS rank FROM components WHERE name = ?
+               UNION ALL
+               SELECT c.tc, c.pc, c.omega, 1 FROM aliases a JOIN components c ON c.id = a.component_id
+               WHERE a.alias = ?
+               UNION ALL
+               SELECT tc, pc, omega, 2 FROM components WHERE formula = ?
+               ORDER BY rank LIMIT 1''',
+            (component, component, component),
+        ).fetchone()
+        if row is None or None in tuple(row):
+            return None
+        return tuple(row)[:3]
+
+    def formulas(self, preset_only=False):
+        """Name -> formula of all components with a formula (optionally only the presets)."""
+        query = "SELECT name, formula FROM components WHERE formula IS NOT NULL"
+        if preset_only:
+            query += " AND preset = 1"
+        return {row["name"]: row["formula"] for row in self.connection.execute(query + " ORDER BY id")}
+
+
+if __name__ == "__main__":
+    catalogue = ComponentCatalogue()
+    catalogue.initialize()
+    print(f"Catalogue {CATALOGUE_FILE}: {len(catalogue.formulas())} components with a formula")
@@ -0,0 +1,164 @@
+import sys
+
+import customtkinter as ctk
+
+HEADERS = ["Component", "Z", "Percentage (%)", "Z x comp", "Molar Mass (g/mol)", "Weight (g)"]
+VISIBLE_ROWS = 10  # Size of the row widget pool
+
+
+class ComponentTable(ctk.CTkFrame):
+    """
+    Scrollable table of mixture components with a fixed pool of row widgets.
+
+    The rows are plain dicts in `self.rows`; only VISIBLE_ROWS sets of widgets
+    exist and scrolling re-binds them to a different slice of the rows.
+    Loading a mixture with 60 components therefore touches 10 rows of
+    widgets instead of creating and gridding 420.
+    """
+
+    def __init__(self, master, component_names, on_change=None, search=None, visible_rows=VISIBLE_ROWS, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows = []  # [{"name": ..., "percentage": ..., "molar_mass": ..., "weight": ...}]
+        self.offset = 0
+        self.visible_rows = visible_rows
+        self.on_change = on_change or (lambda: None)
+        # Optional prefix search (text -> names) for the selectors' drop-down
+        self.component_names = component_names
+        self.search = search
+
+        for col, text in enumerate(HEADERS):
+            ctk.CTkLabel(self, text=text).grid(row=0, column=col, padx=10, pady=5)
+
+        self.pool = [self._create_row_widgets(slot, component_names) for slot in range(visible_rows)]
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scroll)
+        self.scrollbar.grid(row=1, column=len(HEADERS) + 1, rowspan=visible_rows, sticky="ns")
+        self._bind_mouse_wheel(self)
+        self.render()
+
+    def _create_row_widgets(self, slot, component_names):
+        row = slot + 1
+        widgets = {
+            "selector": ctk.CTkComboBox(
+                self, values=component_names, width=150,
+                command=lambda value, s=slot: self._edited(s, "name", value)
+            ),
+            "z": ctk.CTkLabel(self, text="0.0000"),
+            "percentage": ctk.CTkEntry(self),
+            "z_x_comp": ctk.CTkLabel(self, text="0.0000"),
+            "molar_mass": ctk.CTkLabel(self, text="0.0000 g/mol"),
+            "weight": ctk.CTkLabel(self, text="0.0000 g"),
+            "delete_button": ctk.CTkButton(self, text="Delete", command=lambda s=slot: self.delete_row(self.offset + s)),
+        }
+        # Typed edits of the (editable) combobox and the percentage entry
+        for key, field in (("selector", "name"), ("percentage", "percentage")):
+            widgets[key].bind(
+                "<KeyRelease>", lambda event, s=slot, k=key, f=field: self._edited(s, f, widgets[k].get()), add="+"
+            )
+        if self.search is not None:
+            widgets["selector"].bind("<KeyRelease>", lambda event, s=slot: self._type_ahead(s), add="+")
+        for col, key in enumerate(("selector", "z", "percentage", "z_x_comp", "molar_mass", "weight", "delete_button")):
+            widgets[key].grid(row=row, column=col, padx=10, pady=5)
+            self._bind_mouse_wheel(widgets[key])
+        return widgets
+
+    def _bind_mouse_wheel(self, widget):
+        if sys.platform.startswith("linux"):
+            widget.bind("<Button-4>", lambda event: self.scroll_by(-1), add="+")
+            widget.bind("<Button-5>", lambda event: self.scroll_by(1), add="+")
+        else:
+            widget.bind("<MouseWheel>", lambda event: self.scroll_by(-1 if event.delta > 0 else 1), add="+")
+
+    def _type_ahead(self, slot):
+        """Offer the catalogue names starting with the typed text in the drop-down."""
+        selector = self.pool[slot]["selector"]
+        text = selector.get().strip()
+        selector.configure(values=self.search(text) if text else self.component_names)
+
+    def _edited(self, slot, key, value):
+        index = self.offset + slot
+        if index < len(self.rows) and self.rows[index][key] != value:
+            self.rows[index][key] = value
+            self.on_change()
+
+    def render(self):
+        """Bind the pooled widgets to the rows currently scrolled into view."""
+        for slot, widgets in enumerate(self.pool):
+            index = self.offset + slot
+            if index >= len(self.rows):
+                for widget in widgets.values():
+                    widget.grid_remove()
+                continue
+            data = self.rows[index]
+            widgets["selector"].set(data["name"])
+            if widgets["percentage"].get() != data["percentage"]:
+                widgets["percentage"].delete(0, ctk.END)
+                widgets["percentage"].insert(0, data["percentage"])
+            widgets["molar_mass"].configure(text=data["molar_mass"])
+            widgets["weight"].configure(text=data["weight"])
+            for widget in widgets.values():
+                widget.grid()
+
+        if self.rows:
+            first = self.offset / len(self.rows)
+            last = min(1.0, (self.offset + self.visible_rows) / len(self.rows))
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self.rows) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def on_scroll(self, action, value, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'/'pages')."""
+        if action == "moveto":
+            self.scroll_to(round(float(value) * len(self.rows)))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(value) * step)
+
+    def set_rows(self, rows):
+        """Replace all rows with (name, percentage) pairs."""
+        self.rows = [self._new_row(name, percentage) for name, percentage in rows]
+        self.offset = 0
+        self.render()
+        self.on_change()
+
+    def add_row(self, name, percentage="0.0"):
+        self.rows.append(self._new_row(name, percentage))
+        self.scroll_to(len(self.rows))  # Show the new row
+        self.render()
+        self.on_change()
+
+    def delete_row(self, index):
+        if index < len(self.rows):
+            del self.rows[index]
+            self.offset = max(0, min(self.offset, len(self.rows) - self.visible_rows))
+            self.render()
+            self.on_change()
+
+    def get_rows(self):
+        """Current (name, percentage) pairs in table order."""
+        return [(row["name"], row["percentage"]) for row in self.rows]
+
+    def set_results(self, recipe_components):
+        """Show molar mass and weight from a recipe's "components" list (same order as the rows)."""
+        for row, result in zip(self.rows, recipe_components):
+            row["molar_mass"] = f"{result['molar_mass']:.4f} g/mol"
+            row["weight"] = f"{result['weight']:.4f} g"
+        self.render()
+
+    def update_component_names(self, component_names):
+        self.component_names = component_names
+        for widgets in self.pool:
+            widgets["selector"].configure(values=component_names)
+
+    @staticmethod
+    def _new_row(name, percentage):
+        return {"name": name, "percentage": str(percentage), "molar_mass": "0.0000 g/mol", "weight": "0.0000 g"}
@@ -0,0 +1,78 @@
+import itertools
+
+import numpy as np
+
+from filling_sim import DEFAULT_FILLING, R, simulate_filling_ensemble
+from temppredict import heat_capacity_ratio
+
+# Example cylinder types; any key of DEFAULT_FILLING can be overridden per type.
+CYLINDER_TYPES = {
+    "10L steel": {"volume_L": 10.0, "cylinder_mass_kg": 14.0, "surface_area_m2": 0.4},
+    "40L steel": {"volume_L": 40.0, "cylinder_mass_kg": 50.0, "surface_area_m2": 1.0},
+    "50L steel": {"volume_L": 50.0, "cylinder_mass_kg": 58.0, "surface_area_m2": 1.2},
+    "10L aluminium": {"volume_L": 10.0, "cylinder_mass_kg": 9.0, "surface_area_m2": 0.4,
+                      "specific_heat_steel_J_kgK": 900.0},
+}
+
+
+def minimum_fill_times(cylinder_types=CYLINDER_TYPES, gases=("NITROGEN",), T_limit_celsius=65.0,
+                       t_min=10.0, t_max=3600.0, tolerance_seconds=1.0, time_step_seconds=1.0):
+    """
+    Shortest constant-flow fill time that keeps the gas below T_limit_celsius.
+
+    Every (cylinder type, gas) pair is one scenario of `simulate_filling_ensemble`
+    and all pairs are bisected together, so each bisection step is a single
+    ensemble simulation. The peak gas temperature falls monotonically with the
+    fill time, which makes bisection safe. The search runs over whole time
+    steps, so the returned times are multiples of time_step_seconds.
+
+    Parameters:
+        cylinder_types (dict): Name -> overrides of DEFAULT_FILLING.
+        gases (iterable of str): Gas names from temppredict.HEAT_CAPACITY_RATIO.
+        T_limit_celsius (float): Highest allowed gas temperature.
+        t_min, t_max (float): Search bracket for the fill time in seconds.
+        tolerance_seconds (float): Width of the final bracket (at least one step).
+        time_step_seconds (float): Simulation time step.
+
+    Returns:
+        dict: (cylinder type, gas) -> minimum fill time in seconds, NaN if even
+        t_max exceeds the limit.
+    """
+    pairs = list(itertools.product(cylinder_types, gases))
+    scenario = {
+        key: np.array([cylinder_types[c].get(key, DEFAULT_FILLING[key]) for c, _ in pairs], dtype=float)
+        for key in DEFAULT_FILLING if key not in ("filling_time_seconds", "time_step_seconds")
+    }
+    gamma = heat_capacity_ratio([g for _, g in pairs])
+    scenario["Cv_molar"] = R / (gamma - 1)
+    scenario["Cp_molar"] = gamma * scenario["Cv_molar"]
+    T_limit_K = T_limit_celsius + 273.15
+
+    def within_limit(fill_steps):
+        result = simulate_filling_ensemble(
+            filling_time_seconds=fill_steps * time_step_seconds, time_step_seconds=time_step_seconds, **scenario
+        )
+        return result["T_gas_max_K"] <= T_limit_K
+
+    # Bisect over whole steps: a fill time is then always a whole number of steps
+    lo = np.full(len(pairs), int(np.ceil(t_min / time_step_seconds)))
+    hi = np.full(len(pairs), int(np.ceil(t_max / time_step_seconds)))
+    tolerance_steps = max(1, int(tolerance_seconds / time_step_seconds))
+    feasible = within_limit(hi)
+    done_at_min = within_limit(lo)
+    hi[done_at_min] = lo[done_at_min]
+
+    while np.any(hi - lo > tolerance_steps):
+        mid = (lo + hi) // 2
+        ok = within_limit(mid)
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+
+    return {pair: (float(t * time_step_seconds) if f else float("nan")) for pair, t, f in zip(pairs, hi, feasible)}
+
+
+if __name__ == "__main__":
+    fill_times = minimum_fill_times(gases=("NITROGEN", "ARGON", "METHANE"))
+    print("--- Minimum fill time to stay below 65 °C ---")
+    for (cylinder_type, gas), seconds in fill_times.items():
+        print(f"{cylinder_type:>15} {gas:>10}: {seconds / 60:6.1f} min")
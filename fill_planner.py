@@ -0,0 +1,154 @@
+import itertools
+
+import numpy as np
+
+from recipe_engine import calculate_Z_pitzer, compute_recipe, lookup_properties, mix_properties, parse_mixture
+
+MAX_SATURATION = 0.9  # Partial pressure limit as a fraction of the vapour pressure
+MAX_SEARCH_COMPONENTS = 7  # Try all orders up to this many components (7! = 5040)
+
+
+def vapor_pressure_bar(T, T_crit, P_crit, omega_value):
+    """
+    Lee-Kesler vapour pressure (bar) for arrays of components; infinite above
+    the critical temperature, where the component cannot condense.
+    """
+    Tr = T / np.asarray(T_crit, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f0 = 5.92714 - 6.09648 / Tr - 1.28862 * np.log(Tr) + 0.169347 * Tr ** 6
+        f1 = 15.2518 - 15.6875 / Tr - 13.4721 * np.log(Tr) + 0.43577 * Tr ** 6
+        P_sat = np.asarray(P_crit, dtype=float) / 100000 * np.exp(f0 + omega_value * f1)
+    return np.where(Tr < 1, P_sat, np.inf)
+
+
+def _evaluate_orders(orders, moles, properties, P_sat, V, R, T):
+    """
+    Intermediate pressures and saturation ratios of fill orders.
+
+    Parameters:
+        orders (ndarray): (n_orders, n) component indices in filling order.
+
+    Returns:
+        tuple: pressures (bar) and the largest partial pressure / vapour
+        pressure ratio, both of shape (n_orders, n), one column per step.
+    """
+    n_orders, n = orders.shape
+    # present[o, k, i]: component i is in the cylinder after step k of order o
+    step_of = np.empty_like(orders)
+    np.put_along_axis(step_of, orders, np.arange(n)[None, :], axis=1)
+    present = step_of[:, None, :] <= np.arange(n)[None, :, None]
+    step_moles = present * moles
+    cumulative_moles = step_moles.sum(axis=2)
+    y = step_moles / cumulative_moles[..., None]
+
+    T_crit, P_crit, omega_value = mix_properties(properties, y)
+    # Pitzer Z is linear in P: Z = 1 + slope * P, so P V = Z n R T gives P directly
+    slope = calculate_Z_pitzer(1.0, T, T_crit, P_crit, omega_value) - 1
+    nRT = cumulative_moles * R * T
+    denominator = V - nRT * slope
+    pressure = np.where(denominator > 0, nRT / np.where(denominator > 0, denominator, 1), np.inf)
+
+    saturation = np.max(y * pressure[..., None] / P_sat, axis=2)
+    return pressure, saturation
+
+
+def plan_fill_sequence(mixture, components=None, max_saturation=MAX_SATURATION):
+    """
+    Plan the order in which the components of a mixture are filled.
+
+    Each step adds one component; after each step the cumulative target mass
+    and the expected real-gas (Pitzer) pressure are given. An order is
+    feasible when no component's partial pressure exceeds `max_saturation`
+    times its vapour pressure at any step. The least volatile components go
+    first (lowest cylinder pressure); if that order is not feasible, all
+    orders are tried for up to MAX_SEARCH_COMPONENTS components and the one
+    furthest from condensation is taken.
+
+    Parameters:
+        mixture (dict): Mixture in the GUI file format (see `compute_recipe`).
+        components (dict): Component name -> formula.
+        max_saturation (float): Allowed partial pressure / vapour pressure.
+
+    Returns:
+        dict: order (names), feasible, max_saturation (worst ratio of the
+        order), "steps", one dict per addition with name, formula,
+        mass_g, cumulative_mass_g, cumulative_moles, pressure_bar and
+        saturation, and "skipped", the names of components at 0 % (nothing
+        to fill).
+    """
+    recipe = compute_recipe(mixture, components)
+    skipped = [row["name"] for row in recipe["components"] if row["moles"] <= 0]
+    rows = [row for row in recipe["components"] if row["moles"] > 0]
+    if not rows:
+        raise ValueError("Mixture has no components.")
+    inputs = parse_mixture(mixture, components)
+    V, R, T = inputs["cyl_volume"], inputs["gas_constant"], inputs["temperature"]
+
+    names = [row["name"] for row in rows]
+    formulas = [row["formula"] for row in rows]
+    moles = np.array([row["moles"] for row in rows])
+    masses = np.array([row["weight"] for row in rows])
+    properties = lookup_properties(names, formulas)
+    P_sat = vapor_pressure_bar(T, *properties)
+
+    # Least volatile first, smaller amounts first among equally volatile ones
+    order = np.lexsort((moles, P_sat))[None, :]
+    pressure, saturation = _evaluate_orders(order, moles, properties, P_sat, V, R, T)
+    worst = saturation.max(axis=1)
+    if worst[0] > max_saturation and 1 < len(rows) <= MAX_SEARCH_COMPONENTS:
+        orders = np.array(list(itertools.permutations(range(len(rows)))))
+        pressures, saturations = _evaluate_orders(orders, moles, properties, P_sat, V, R, T)
+        worst_all = saturations.max(axis=1)
+        best = int(np.argmin(worst_all))
+        if worst_all[best] < worst[0]:
+            order, pressure, saturation, worst = orders[best:best + 1], pressures[best:best + 1], \
+                saturations[best:best + 1], worst_all[best:best + 1]
+
+    order, pressure, saturation = order[0], pressure[0], saturation[0]
+    cumulative_mass = np.cumsum(masses[order])
+    cumulative_moles = np.cumsum(moles[order])
+    return {
+        "order": [rows[i]["name"] for i in order],
+        "feasible": bool(worst[0] <= max_saturation),
+        "max_saturation": float(worst[0]),
+        "steps": [
+            {
+                "step": k + 1,
+                "name": rows[i]["name"],
+                "formula": rows[i]["formula"],
+                "mass_g": float(masses[i]),
+                "cumulative_mass_g": float(cumulative_mass[k]),
+                "cumulative_moles": float(cumulative_moles[k]),
+                "pressure_bar": float(pressure[k]),
+                "saturation": float(saturation[k]),
+            }
+            for k, i in enumerate(order)
+        ],
+        "skipped": skipped,
+    }
+
+
+def plan_fill_sequences(mixtures, components=None, max_saturation=MAX_SATURATION):
+    """Fill plans of many mixtures; see `plan_fill_sequence`."""
+    return [plan_fill_sequence(mixture, components, max_saturation) for mixture in mixtures]
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from recipe_defaults import CONFIG_FILE
+
+    # Usage: python fill_planner.py mixture.json [mixture2.json ...]
+    with open(CONFIG_FILE, "r") as file:
+        COMPONENTS = json.load(file)
+    for path in sys.argv[1:]:
+        with open(path, "r") as file:
+            plan = plan_fill_sequence(json.load(file), COMPONENTS)
+        print(f"{path}: {'feasible' if plan['feasible'] else 'NOT feasible'} "
+              f"(max saturation {plan['max_saturation']:.2f})")
+        for step in plan["steps"]:
+            print(f"{step['step']:>3}. {step['name']:>25}: +{step['mass_g']:9.4f} g, "
+                  f"total {step['cumulative_mass_g']:10.4f} g, {step['pressure_bar']:8.2f} bar")
+        if plan["skipped"]:
+            print(f"     skipped (0 %): {', '.join(plan['skipped'])}")
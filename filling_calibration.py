@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+from scipy.sparse import lil_matrix
+
+from filling_sim import DEFAULT_FILLING, simulate_filling_ensemble
+
+# Operating conditions of a fill that are taken from the log rather than fitted.
+CONDITION_KEYS = (
+    "volume_L", "P_i", "P_f", "T_initial_celsius", "filling_time_seconds",
+    "surface_area_m2", "specific_heat_steel_J_kgK", "cylinder_mass_kg",
+)
+
+# Weight of a 1 bar pressure residual relative to a 1 K temperature residual.
+PRESSURE_WEIGHT = 0.5
+
+
+def load_fill_log(file_path, **conditions):
+    """
+    Load a recorded fill from a CSV file.
+
+    The file needs a `time_s` and a `gas_temp_C` column; a `pressure_bar`
+    column is used as well when present. Keyword arguments are the operating
+    conditions of the fill (see CONDITION_KEYS); missing ones fall back to
+    DEFAULT_FILLING.
+    """
+    df = pd.read_csv(file_path)
+    for column in ("time_s", "gas_temp_C"):
+        if column not in df.columns:
+            raise ValueError(f"The fill log must have a column named '{column}'.")
+    log = {
+        "name": str(file_path),
+        "time_s": df["time_s"].to_numpy(dtype=float),
+        "gas_temp_C": df["gas_temp_C"].to_numpy(dtype=float),
+        "pressure_bar": df["pressure_bar"].to_numpy(dtype=float) if "pressure_bar" in df.columns else None,
+    }
+    log.update(conditions)
+    return log
+
+
+def _conditions(logs):
+    """Stack the operating conditions of all logs into arrays, one entry per log."""
+    return {
+        key: np.array([log.get(key, DEFAULT_FILLING[key]) for log in logs], dtype=float)
+        for key in CONDITION_KEYS
+    }
+
+
+def _sample_history(history, time_s, log_times):
+    """Linearly interpolate each scenario's history at the times of its log."""
+    return [np.interp(t, time_s, history[:, j]) for j, t in enumerate(log_times)]
+
+
+def _residuals(logs, conditions, U, wall_mass, time_step_seconds):
+    result = simulate_filling_ensemble(
+        U_heat_transfer_coeff_W_m2K=U,
+        **dict(conditions, cylinder_mass_kg=wall_mass),
+        time_step_seconds=time_step_seconds,
+        record_history=True,
+        duration_seconds=max(log["time_s"][-1] for log in logs),
+    )
+    log_times = [log["time_s"] for log in logs]
+    temperatures = _sample_history(result["T_gas_history_K"] - 273.15, result["time_s"], log_times)
+    pressures = _sample_history(result["pressure_history_bar"], result["time_s"], log_times)
+
+    residuals = []
+    for log, T_model, P_model in zip(logs, temperatures, pressures):
+        log_residuals = [T_model - log["gas_temp_C"]]
+        if log.get("pressure_bar") is not None:
+            log_residuals.append(PRESSURE_WEIGHT * (P_model - log["pressure_bar"]))
+        residuals.append(np.concatenate(log_residuals))
+    return residuals
+
+
+def fit_heat_transfer(logs, fit_wall_mass=False, per_log=False, time_step_seconds=1.0,
+                      U_initial=DEFAULT_FILLING["U_heat_transfer_coeff_W_m2K"]):
+    """
+    Fit the heat transfer coefficient U (and optionally the effective wall
+    mass) to one or many recorded fills by least squares.
+
+    All logs are simulated together in one call of `simulate_filling_ensemble`
+    per objective evaluation. With `per_log` every log gets its own
+    parameters; the Jacobian is then block-sparse, so the finite-difference
+    Jacobian still costs only a couple of ensemble simulations.
+
+    Parameters:
+        logs (list of dict): Fill logs as returned by `load_fill_log`.
+        fit_wall_mass (bool): Also fit the effective cylinder (wall) mass.
+        per_log (bool): Fit separate parameters for each log instead of one shared set.
+        time_step_seconds (float): Simulation time step.
+        U_initial (float): Starting value for U in W/m^2K.
+
+    Returns:
+        dict: U_heat_transfer_coeff_W_m2K (and cylinder_mass_kg) as floats, or
+        arrays with one value per log if `per_log`, plus rms_residual and success.
+    """
+    conditions = _conditions(logs)
+    n_logs = len(logs)
+    n_sets = n_logs if per_log else 1
+    n_params = 2 if fit_wall_mass else 1
+
+    # Fit in log space so U and the wall mass stay positive.
+    x0 = [np.full(n_sets, np.log(U_initial))]
+    if fit_wall_mass:
+        x0.append(np.log(conditions["cylinder_mass_kg"]) if per_log
+                  else np.full(1, np.log(conditions["cylinder_mass_kg"].mean())))
+    x0 = np.concatenate(x0)
+
+    def unpack(x):
+        params = np.exp(x).reshape(n_params, n_sets)
+        U = np.broadcast_to(params[0], n_logs)
+        wall_mass = np.broadcast_to(params[1], n_logs) if fit_wall_mass else conditions["cylinder_mass_kg"]
+        return U, wall_mass
+
+    def objective(x):
+        U, wall_mass = unpack(x)
+        return np.concatenate(_residuals(logs, conditions, U, wall_mass, time_step_seconds))
+
+    jac_sparsity = None
+    if per_log:
+        # Residuals of log j only depend on the parameters of log j.
+        lengths = [len(r) for r in _residuals(logs, conditions, *unpack(x0), time_step_seconds)]
+        jac_sparsity = lil_matrix((sum(lengths), x0.size), dtype=int)
+        start = 0
+        for j, length in enumerate(lengths):
+            for p in range(n_params):
+                jac_sparsity[start:start + length, p * n_sets + j] = 1
+            start += length
+
+    fit = least_squares(objective, x0, jac_sparsity=jac_sparsity, x_scale="jac")
+    U, wall_mass = unpack(fit.x)
+
+    result = {
+        "U_heat_transfer_coeff_W_m2K": U.copy() if per_log else float(U[0]),
+        "rms_residual": float(np.sqrt(np.mean(fit.fun ** 2))),
+        "success": bool(fit.success),
+    }
+    if fit_wall_mass:
+        result["cylinder_mass_kg"] = wall_mass.copy() if per_log else float(wall_mass[0])
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python filling_calibration.py log1.csv [log2.csv ...]
+    fill_logs = [load_fill_log(path) for path in sys.argv[1:]]
+    if not fill_logs:
+        sys.exit("Usage: python filling_calibration.py log1.csv [log2.csv ...]")
+    fitted = fit_heat_transfer(fill_logs, fit_wall_mass=True)
+    print(f"U: {fitted['U_heat_transfer_coeff_W_m2K']:.1f} W/m^2K")
+    print(f"Effective wall mass: {fitted['cylinder_mass_kg']:.2f} kg")
+    print(f"RMS residual: {fitted['rms_residual']:.3f}")
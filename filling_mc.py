@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from filling_sim import DEFAULT_FILLING, simulate_filling_ensemble
+
+# Uncertain inputs of the filling model and the distributions they are drawn from.
+#   ("normal", mean, std) | ("lognormal", median, sigma_of_log)
+#   ("uniform", low, high) | ("triangular", low, mode, high)
+DEFAULT_DISTRIBUTIONS = {
+    "U_heat_transfer_coeff_W_m2K": ("lognormal", 150.0, 0.3),
+    "cylinder_mass_kg": ("normal", 14.0, 1.0),
+    "surface_area_m2": ("uniform", 0.35, 0.45),
+}
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+
+def sample_distribution(rng, spec, size):
+    """
+    Draw `size` samples for one input from a distribution spec tuple.
+    """
+    kind, *args = spec
+    if kind == "normal":
+        return rng.normal(args[0], args[1], size)
+    if kind == "lognormal":
+        return args[0] * np.exp(rng.normal(0.0, args[1], size))
+    if kind == "uniform":
+        return rng.uniform(args[0], args[1], size)
+    if kind == "triangular":
+        return rng.triangular(args[0], args[1], args[2], size)
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def _run_chunk(task):
+    """
+    Sample and simulate one chunk. Runs inside a worker process.
+    """
+    seed_sequence, size, distributions, fixed = task
+    rng = np.random.default_rng(seed_sequence)
+    inputs = dict(fixed)
+    for name, spec in distributions.items():
+        inputs[name] = sample_distribution(rng, spec, size)
+    result = simulate_filling_ensemble(stop_at_target_pressure=True, **inputs)
+    return result["T_gas_K"] - 273.15, result["settled_pressure_bar"]
+
+
+def run_monte_carlo(n_samples=100_000, distributions=DEFAULT_DISTRIBUTIONS, fixed=None,
+                    chunk_size=10_000, seed=0, percentiles=DEFAULT_PERCENTILES, max_workers=None):
+    """
+    Propagate input uncertainty through the filling model.
+
+    The samples are split into chunks which are simulated on a process pool.
+    Each chunk gets its own child of one `SeedSequence`, so the result only
+    depends on `seed`, `n_samples` and `chunk_size`, not on the number of
+    workers or the order in which chunks finish.
+
+    Parameters:
+        n_samples (int): Total number of Monte Carlo samples.
+        distributions (dict): Input name -> distribution spec (see DEFAULT_DISTRIBUTIONS).
+        fixed (dict): Overrides for the deterministic inputs (defaults: DEFAULT_FILLING).
+        chunk_size (int): Samples simulated per task.
+        seed (int): Root seed.
+        percentiles (tuple): Percentiles to report.
+        max_workers (int): Size of the process pool; 1 runs in-process.
+
+    Returns:
+        dict: Percentile -> value for "final_temperature_C" and "settled_pressure_bar".
+    """
+    fixed_inputs = {k: v for k, v in DEFAULT_FILLING.items() if k not in distributions}
+    fixed_inputs.update(fixed or {})
+
+    n_chunks = -(-n_samples // chunk_size)
+    sizes = [chunk_size] * (n_chunks - 1) + [n_samples - chunk_size * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [(s, size, distributions, fixed_inputs) for s, size in zip(seeds, sizes)]
+
+    if max_workers == 1:
+        results = list(map(_run_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            results = list(pool.map(_run_chunk, tasks))
+
+    temperatures = np.concatenate([r[0] for r in results])
+    pressures = np.concatenate([r[1] for r in results])
+    return {
+        "n_samples": n_samples,
+        "final_temperature_C": dict(zip(percentiles, np.percentile(temperatures, percentiles))),
+        "settled_pressure_bar": dict(zip(percentiles, np.percentile(pressures, percentiles))),
+    }
+
+
+if __name__ == "__main__":
+    bands = run_monte_carlo()
+    print(f"--- Monte Carlo ({bands['n_samples']} samples) ---")
+    for key in ("final_temperature_C", "settled_pressure_bar"):
+        values = ", ".join(f"P{p}: {v:.2f}" for p, v in bands[key].items())
+        print(f"{key}: {values}")
@@ -1,5 +1,256 @@
 import numpy as np
 
+# --- Default Inputs (10L steel cylinder filled with nitrogen) ---
+DEFAULT_FILLING = {
+    "volume_L": 10.0,  # Volume of the cylinder in Liters
+    "P_i": 1.0,  # Initial pressure in bar
+    "P_f": 150.0,  # Target final pressure in bar
+    "T_initial_celsius": 25.0,  # Initial temperature of gas and cylinder in Celsius
+    "filling_time_seconds": 5 * 60,  # 5 minutes
+    "time_step_seconds": 1.0,  # Simulation time step in seconds
+    "cylinder_mass_kg": 14.0,  # Estimated mass of the steel cylinder
+    "specific_heat_steel_J_kgK": 450.0,  # Specific heat capacity of steel
+    "surface_area_m2": 0.4,  # Estimated surface area of the inside of the cylinder
+    "U_heat_transfer_coeff_W_m2K": 150.0,  # Overall heat transfer coefficient (gas to wall)
+}
+
+# --- Wall material properties for the radial wall model ---
+WALL_MATERIALS = {
+    "steel": {"density_kg_m3": 7850.0, "conductivity_W_mK": 45.0, "specific_heat_J_kgK": 450.0},
+    "aluminium": {"density_kg_m3": 2700.0, "conductivity_W_mK": 160.0, "specific_heat_J_kgK": 900.0},
+    "composite": {"density_kg_m3": 1600.0, "conductivity_W_mK": 0.5, "specific_heat_J_kgK": 1000.0},
+}
+
+R = 8.314  # Ideal gas constant in J/(mol*K)
+
+# --- Constants for Nitrogen (as an ideal diatomic gas) ---
+CV_MOLAR_N2 = 5/2 * R  # Molar specific heat at constant volume
+CP_MOLAR_N2 = 7/2 * R  # Molar specific heat at constant pressure
+
+
+def solve_tridiagonal(lower, diag, upper, rhs):
+    """
+    Solve a batch of tridiagonal systems with the Thomas algorithm in O(n).
+
+    All arguments have shape (n, *batch); lower[0] and upper[-1] are ignored.
+    The sweep runs over the n rows while every batch element is solved at
+    once, so an ensemble of scenarios costs the same number of numpy calls as
+    a single one.
+    """
+    n = diag.shape[0]
+    c_prime = np.empty_like(diag)
+    d_prime = np.empty_like(rhs)
+    c_prime[0] = upper[0] / diag[0]
+    d_prime[0] = rhs[0] / diag[0]
+    for k in range(1, n):
+        denominator = diag[k] - lower[k] * c_prime[k - 1]
+        c_prime[k] = upper[k] / denominator
+        d_prime[k] = (rhs[k] - lower[k] * d_prime[k - 1]) / denominator
+    x = np.empty_like(rhs)
+    x[-1] = d_prime[-1]
+    for k in range(n - 2, -1, -1):
+        x[k] = d_prime[k] - c_prime[k] * x[k + 1]
+    return x
+
+
+def _radial_wall(volume_m3, area, m_cyl, c_wall, density, conductivity, wall_nodes):
+    """
+    Finite-volume discretisation of the cylinder wall into `wall_nodes` shells.
+
+    The cylinder is treated as a long tube: inner radius r_i = 2V/A and length
+    L = A/(2*pi*r_i). The outer radius follows from the wall mass and density,
+    so the shells hold exactly m*c of heat capacity, like the lumped model.
+
+    Returns:
+        tuple: Heat capacity of each shell (wall_nodes, *shape), conductance
+        between neighbouring shell centres (wall_nodes - 1, *shape) and
+        conduction conductance from the inner surface to the first shell centre.
+    """
+    r_inner = 2 * volume_m3 / area
+    length = area / (2 * np.pi * r_inner)
+    r_outer = np.sqrt(r_inner ** 2 + m_cyl / (density * np.pi * length))
+
+    fractions = np.linspace(0.0, 1.0, wall_nodes + 1).reshape((-1,) + (1,) * np.ndim(r_inner))
+    faces = r_inner + fractions * (r_outer - r_inner)
+    centres = 0.5 * (faces[1:] + faces[:-1])
+
+    capacities = density * np.pi * length * (faces[1:] ** 2 - faces[:-1] ** 2) * c_wall
+    shell_conductance = 2 * np.pi * length * conductivity / np.log(centres[1:] / centres[:-1])
+    surface_conductance = 2 * np.pi * length * conductivity / np.log(centres[0] / r_inner)
+    return capacities, shell_conductance, surface_conductance
+
+
+def simulate_filling_ensemble(
+    U_heat_transfer_coeff_W_m2K=DEFAULT_FILLING["U_heat_transfer_coeff_W_m2K"],
+    cylinder_mass_kg=DEFAULT_FILLING["cylinder_mass_kg"],
+    surface_area_m2=DEFAULT_FILLING["surface_area_m2"],
+    volume_L=DEFAULT_FILLING["volume_L"],
+    P_i=DEFAULT_FILLING["P_i"],
+    P_f=DEFAULT_FILLING["P_f"],
+    T_initial_celsius=DEFAULT_FILLING["T_initial_celsius"],
+    filling_time_seconds=DEFAULT_FILLING["filling_time_seconds"],
+    specific_heat_steel_J_kgK=DEFAULT_FILLING["specific_heat_steel_J_kgK"],
+    Cv_molar=CV_MOLAR_N2,
+    Cp_molar=CP_MOLAR_N2,
+    time_step_seconds=DEFAULT_FILLING["time_step_seconds"],
+    stop_at_target_pressure=False,
+    record_history=False,
+    duration_seconds=None,
+    wall_model="lumped",
+    wall_nodes=20,
+    wall_density_kg_m3=WALL_MATERIALS["steel"]["density_kg_m3"],
+    wall_conductivity_W_mK=WALL_MATERIALS["steel"]["conductivity_W_mK"],
+):
+    """
+    Vectorized version of the filling model in `simulate_filling_with_heat_loss`.
+
+    Every physical parameter may be a scalar or an array; they are broadcast
+    against each other and each element is an independent filling scenario.
+    The time loop is shared, so the cost of one step is a handful of numpy
+    operations regardless of how many scenarios are simulated.
+
+    If `stop_at_target_pressure` is True the gas flow of a scenario stops as
+    soon as its (hot) gas pressure reaches P_f, like a filling panel does.
+    The settled pressure is the pressure once the gas has cooled back to the
+    initial (ambient) temperature. `duration_seconds` extends the simulation
+    past the end of the fill, e.g. to follow the cool-down in a recorded log.
+
+    With `wall_model="radial"` the wall is split into `wall_nodes` shells and
+    heat conduction through it is solved implicitly every step, together with
+    the gas, as one tridiagonal system per scenario (see `solve_tridiagonal`).
+    This resolves the hot inner surface of thick steel and composite walls
+    that the uniform (lumped) wall temperature misses.
+
+    Returns:
+        dict: Arrays with the broadcast shape of the inputs:
+            T_gas_K, T_gas_max_K, T_cylinder_K (mean wall temperature),
+            pressure_bar, settled_pressure_bar, moles. The radial model adds
+            T_wall_inner_K and T_wall_outer_K. With `record_history` also
+            time_s (num_steps + 1,) and T_gas_history_K, pressure_history_bar
+            (num_steps + 1, *shape).
+    """
+    if wall_model not in ("lumped", "radial"):
+        raise ValueError(f"Unknown wall model: {wall_model}")
+
+    (U, m_cyl, area, V, P_i, P_f, T0_c, t_fill, c_steel, Cv, Cp, rho_wall, k_wall) = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (
+            U_heat_transfer_coeff_W_m2K, cylinder_mass_kg, surface_area_m2, volume_L,
+            P_i, P_f, T_initial_celsius, filling_time_seconds,
+            specific_heat_steel_J_kgK, Cv_molar, Cp_molar,
+            wall_density_kg_m3, wall_conductivity_W_mK,
+        ))
+    )
+
+    # --- Initialization ---
+    V_m3 = V / 1000
+    T_ambient_K = T0_c + 273.15
+    T_gas_K = T_ambient_K.copy()
+    T_cylinder_K = T_ambient_K.copy()
+    T_gas_max_K = T_ambient_K
+    T_inlet_gas_K = T_ambient_K  # Assume inlet gas is at ambient temp
+
+    # Initial moles and the constant molar flow rate needed to reach P_f at ambient temp
+    n_initial = (P_i * 1e5 * V_m3) / (R * T_ambient_K)
+    n_target_final = (P_f * 1e5 * V_m3) / (R * T_ambient_K)
+    molar_flow_rate = (n_target_final - n_initial) / t_fill
+
+    n_current = n_initial.copy()
+    wall_heat_capacity = m_cyl * c_steel
+    conductance = U * area * time_step_seconds
+    filling = np.ones(n_current.shape, dtype=bool)
+
+    if wall_model == "radial":
+        shell_capacity, shell_conductance, surface_conductance = _radial_wall(
+            V_m3, area, m_cyl, c_steel, rho_wall, k_wall, wall_nodes
+        )
+        # Node 0 is the gas, nodes 1..wall_nodes the wall shells. Gas and first
+        # shell are coupled through the film (U*A) and half a shell in series.
+        links = np.concatenate([
+            (1.0 / (1.0 / (U * area) + 1.0 / surface_conductance))[np.newaxis],
+            shell_conductance,
+        ]) * time_step_seconds
+        off_diagonal = -links
+        link_sum = np.zeros((wall_nodes + 1,) + n_current.shape)
+        link_sum[:-1] += links
+        link_sum[1:] += links
+        lower = np.concatenate([np.zeros((1,) + n_current.shape), off_diagonal])
+        upper = np.concatenate([off_diagonal, np.zeros((1,) + n_current.shape)])
+        node_capacity = np.concatenate([np.zeros((1,) + n_current.shape), shell_capacity])
+        T_nodes_K = np.broadcast_to(T_ambient_K, (wall_nodes + 1,) + n_current.shape).copy()
+
+    # Round before ceil so that e.g. 1.1 s / 0.1 s does not become 12 steps
+    num_steps = int(np.ceil(round(max(np.max(t_fill), duration_seconds or 0) / time_step_seconds, 9)))
+    if record_history:
+        T_gas_history_K = np.empty((num_steps + 1,) + n_current.shape)
+        moles_history = np.empty_like(T_gas_history_K)
+        T_gas_history_K[0] = T_gas_K
+        moles_history[0] = n_current
+
+    # --- Simulation Loop ---
+    for i in range(num_steps):
+        # The last step of a fill that ends mid-step only adds gas for the remaining time
+        step_fill_seconds = np.clip(t_fill - i * time_step_seconds, 0.0, time_step_seconds)
+        filling &= step_fill_seconds > 0
+        moles_added = np.where(filling, molar_flow_rate * step_fill_seconds, 0.0)
+        n_previous = n_current
+        n_current = n_previous + moles_added
+
+        # 1. Temperature rise from adding new gas (adiabatic compression)
+        T_intermediate_gas_K = (n_previous * Cv * T_gas_K + moles_added * Cp * T_inlet_gas_K) / (n_current * Cv)
+
+        gas_heat_capacity = n_current * Cv
+
+        if wall_model == "radial":
+            # 2./3. Implicit (backward Euler) heat exchange of gas and wall shells:
+            # (C_k + dt*sum(G)) T_k' - dt*G T_neighbour' = C_k T_k
+            node_capacity[0] = gas_heat_capacity
+            T_nodes_K[0] = T_intermediate_gas_K
+            T_nodes_K = solve_tridiagonal(lower, node_capacity + link_sum, upper, node_capacity * T_nodes_K)
+            T_gas_K = T_nodes_K[0]
+            T_cylinder_K = (shell_capacity * T_nodes_K[1:]).sum(axis=0) / wall_heat_capacity
+        else:
+            # 2. Heat loss from gas to cylinder wall in this time step.
+            # The gas/wall temperature difference relaxes exponentially over the step,
+            # Q = (T_gas - T_cylinder) * (1 - exp(-U*A*dt/C_eff)) * C_eff, with
+            # 1/C_eff = 1/(n*Cv) + 1/(m*c). Unlike the explicit Q = U*A*dT*dt this
+            # stays stable when the gas heat capacity is small at low pressure.
+            effective_heat_capacity = 1.0 / (1.0 / gas_heat_capacity + 1.0 / wall_heat_capacity)
+            heat_lost_from_gas_J = (
+                (T_intermediate_gas_K - T_cylinder_K)
+                * -np.expm1(-conductance / effective_heat_capacity)
+                * effective_heat_capacity
+            )
+
+            # 3. Update temperatures based on heat transfer
+            T_gas_K = T_intermediate_gas_K - heat_lost_from_gas_J / gas_heat_capacity
+            T_cylinder_K = T_cylinder_K + heat_lost_from_gas_J / wall_heat_capacity
+        T_gas_max_K = np.maximum(T_gas_max_K, T_gas_K)
+
+        if stop_at_target_pressure:
+            filling &= (n_current * R * T_gas_K) / V_m3 < P_f * 1e5
+
+        if record_history:
+            T_gas_history_K[i + 1] = T_gas_K
+            moles_history[i + 1] = n_current
+
+    result = {
+        "T_gas_K": T_gas_K,
+        "T_gas_max_K": T_gas_max_K,
+        "T_cylinder_K": T_cylinder_K,
+        "pressure_bar": (n_current * R * T_gas_K) / V_m3 / 1e5,
+        "settled_pressure_bar": (n_current * R * T_ambient_K) / V_m3 / 1e5,
+        "moles": n_current,
+    }
+    if wall_model == "radial":
+        result["T_wall_inner_K"] = T_nodes_K[1]
+        result["T_wall_outer_K"] = T_nodes_K[-1]
+    if record_history:
+        result["time_s"] = np.arange(num_steps + 1) * time_step_seconds
+        result["T_gas_history_K"] = T_gas_history_K
+        result["pressure_history_bar"] = (moles_history * R * T_gas_history_K) / V_m3 / 1e5
+    return result
+
+
 def simulate_filling_with_heat_loss():
     """
     Simulates the gas cylinder filling process over time, including heat
@@ -12,94 +263,28 @@ def simulate_filling_with_heat_loss():
     4. Heat loss from the cylinder to the outside air is neglected for simplicity,
        as the primary heat transfer in the short filling time is from gas to cylinder.
     """
+    params = DEFAULT_FILLING
 
-    # --- Input Parameters ---
-    V = 10.0  # Volume of the cylinder in Liters
-    P_i = 1.0  # Initial pressure in bar
-    P_f = 150.0 # Target final pressure in bar
-    T_initial_celsius = 25.0  # Initial temperature of gas and cylinder in Celsius
-
-    # --- Filling Process Parameters ---
-    filling_time_seconds = 5 * 60  # 10 minutes
-    time_step_seconds = 1.0         # Simulation time step in seconds
-
-    # --- Cylinder Physical Properties (Estimated for a 10L steel cylinder) ---
-    cylinder_mass_kg = 14.0 # Estimated mass of the steel cylinder
-    specific_heat_steel_J_kgK = 450.0 # Specific heat capacity of steel
-    # Estimated surface area of the inside of the cylinder
-    surface_area_m2 = 0.4
-    # Overall heat transfer coefficient (gas to cylinder wall).
-    # This is a critical assumption. Higher values mean faster cooling.
-    U_heat_transfer_coeff_W_m2K = 150.0
-
-    # --- Constants for Nitrogen (as an ideal diatomic gas) ---
-    R = 8.314  # Ideal gas constant in J/(mol*K)
-    Cv_molar = 5/2 * R  # Molar specific heat at constant volume
-    Cp_molar = 7/2 * R  # Molar specific heat at constant pressure
-
-    # --- Initialization ---
-    # Convert units
-    V_m3 = V / 1000
-    P_i_pa = P_i * 1e5
-    P_f_pa = P_f * 1e5
-    T_gas_K = T_initial_celsius + 273.15
-    T_cylinder_K = T_initial_celsius + 273.15
-    T_inlet_gas_K = T_initial_celsius + 273.15 # Assume inlet gas is at ambient temp
-
-    # Calculate initial moles and target final moles (for flow rate)
-    n_initial = (P_i_pa * V_m3) / (R * T_gas_K)
-    # Estimate target moles assuming final temp is close to initial temp
-    n_target_final = (P_f_pa * V_m3) / (R * T_gas_K)
-    
-    # Calculate required constant molar flow rate
-    molar_flow_rate = (n_target_final - n_initial) / filling_time_seconds
-    
-    n_current = n_initial
-    
-    num_steps = int(filling_time_seconds / time_step_seconds)
-    
     print("--- Simulation Started ---")
-    print(f"Cylinder Mass: {cylinder_mass_kg} kg, Surface Area: {surface_area_m2} m^2")
-    print(f"Heat Transfer Coefficient (U): {U_heat_transfer_coeff_W_m2K} W/m^2K")
+    print(f"Cylinder Mass: {params['cylinder_mass_kg']} kg, Surface Area: {params['surface_area_m2']} m^2")
+    print(f"Heat Transfer Coefficient (U): {params['U_heat_transfer_coeff_W_m2K']} W/m^2K")
     print("-" * 30)
 
-    # --- Simulation Loop ---
-    for i in range(num_steps):
-        # Moles added in this time step
-        moles_added = molar_flow_rate * time_step_seconds
-        n_previous = n_current
-        n_current = n_previous + moles_added
-
-        # 1. Calculate temperature rise from adding new gas (adiabatic compression)
-        # Energy balance: n_new * Cv * T_intermediate = n_old * Cv * T_old + dn * Cp * T_inlet
-        T_intermediate_gas_K = (n_previous * Cv_molar * T_gas_K + moles_added * Cp_molar * T_inlet_gas_K) / (n_current * Cv_molar)
-
-        # 2. Calculate heat loss from gas to cylinder wall in this time step
-        # Q = U * A * (T_gas - T_cylinder) * dt
-        heat_lost_from_gas_J = U_heat_transfer_coeff_W_m2K * surface_area_m2 * (T_intermediate_gas_K - T_cylinder_K) * time_step_seconds
-        
-        # 3. Update temperatures based on heat transfer
-        # Temperature drop in gas due to heat loss
-        delta_T_gas_cooling = heat_lost_from_gas_J / (n_current * Cv_molar)
-        T_gas_K = T_intermediate_gas_K - delta_T_gas_cooling
-        
-        # Temperature rise in cylinder due to heat gain
-        delta_T_cylinder_heating = heat_lost_from_gas_J / (cylinder_mass_kg * specific_heat_steel_J_kgK)
-        T_cylinder_K = T_cylinder_K + delta_T_cylinder_heating
+    result = simulate_filling_ensemble(**params)
 
     # --- Final Results ---
-    final_pressure_pa = (n_current * R * T_gas_K) / V_m3
-    final_pressure_bar = final_pressure_pa / 1e5
-    
-    T_gas_celsius = T_gas_K - 273.15
-    T_cylinder_celsius = T_cylinder_K - 273.15
-    
+    final_pressure_bar = float(result["pressure_bar"])
+    T_gas_celsius = float(result["T_gas_K"]) - 273.15
+    T_cylinder_celsius = float(result["T_cylinder_K"]) - 273.15
+
     print("--- Simulation Finished ---")
-    print(f"Filling Time: {filling_time_seconds / 60:.0f} minutes")
+    print(f"Filling Time: {params['filling_time_seconds'] / 60:.0f} minutes")
     print("-" * 30)
     print(f"Final Calculated Pressure: {final_pressure_bar:.2f} bar")
     print(f"Final Gas Temperature: {T_gas_celsius:.2f} °C")
     print(f"Final Cylinder Wall Temperature: {T_cylinder_celsius:.2f} °C")
     print("-" * 30)
 
-simulate_filling_with_heat_loss()
\ No newline at end of file
+
+if __name__ == "__main__":
+    simulate_filling_with_heat_loss()
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+
+import numpy as np
+from molmass import Formula, FormulaError
+
+from recipe_defaults import CONFIG_FILE
+
+
+class MolarMassCache:
+    """
+    Formula -> molar mass (g/mol) cache.
+
+    The formulas of the component configuration file are parsed up front
+    (skipping any molmass cannot parse), and any other formula is parsed once
+    on first use. When the configuration file
+    changes on disk (modification time or size) the cache is rebuilt from it,
+    so components added through the GUI are preloaded as well.
+    """
+
+    def __init__(self, config_file=CONFIG_FILE):
+        self.config_file = config_file
+        self._masses = {}
+        self._config_stamp = None
+        self._lock = threading.Lock()
+
+    def _config_changed(self):
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            stamp = None
+        else:
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._config_stamp:
+            return False
+        self._config_stamp = stamp
+        return True
+
+    def _reload(self):
+        self._masses = {}
+        if self._config_stamp is None:
+            return
+        with open(self.config_file, "r") as file:
+            components = json.load(file)
+        for formula in components.values():
+            try:
+                self._parse(formula)
+            except FormulaError:
+                pass  # Only fails the recipes that use this formula, when they look it up
+
+    def _parse(self, formula):
+        mass = self._masses[formula] = Formula(formula).mass
+        return mass
+
+    def refresh(self):
+        """Rebuild the cache if the configuration file changed."""
+        with self._lock:
+            if self._config_changed():
+                self._reload()
+
+    def mass(self, formula):
+        """Molar mass of one formula in g/mol."""
+        self.refresh()
+        try:
+            return self._masses[formula]
+        except KeyError:
+            with self._lock:
+                return self._parse(formula)
+
+    def masses(self, formulas):
+        """Molar masses of many formulas as an array; each distinct formula is looked up once."""
+        with self._lock:
+            if self._config_changed():
+                self._reload()
+            cache = self._masses
+            for formula in set(formulas).difference(cache):
+                self._parse(formula)
+            return np.fromiter((cache[f] for f in formulas), dtype=float, count=len(formulas))
+
+
+_default_cache = MolarMassCache()
+
+
+def molar_mass(formula):
+    """Molar mass (g/mol) of a formula from the shared cache."""
+    return _default_cache.mass(formula)
+
+
+def molar_masses(formulas):
+    """Molar masses (g/mol) of many formulas from the shared cache."""
+    return _default_cache.masses(formulas)
@@ -0,0 +1,202 @@
+import csv
+import json
+import os
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from recipe_defaults import CONFIG_FILE, MATERIAL_CAS_FILE
+
+# British spellings are folded so "SULPHIDE" and "sulfide" normalize alike
+SPELLINGS = [("sulph", "sulf"), ("aluminium", "aluminum"), ("caesium", "cesium")]
+
+
+def normalize_name(name):
+    """Case-folded, spelling-folded name with punctuation reduced to single spaces."""
+    text = str(name).casefold()
+    for british, american in SPELLINGS:
+        text = text.replace(british, american)
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    In-memory trigram index over component names and their aliases.
+
+    Every alias points to a canonical component name. A query is normalized,
+    split into trigrams, and the shared trigram counts of all aliases are
+    gathered with one `np.bincount` over the posting lists; the Dice
+    coefficient of those counts ranks the matches. Exact and prefix matches
+    of the normalized text rank first.
+    """
+
+    def __init__(self):
+        self.aliases = []  # normalized alias per entry
+        self.targets = []  # canonical name per entry
+        self.cas = []  # CAS RN per entry ("" if unknown)
+        self._seen = set()
+        self._postings = None
+
+    def add(self, alias, target, cas=""):
+        """Add an alias of a canonical component name; the index is rebuilt on the next query."""
+        normalized = normalize_name(alias)
+        if not normalized or (normalized, target) in self._seen:
+            return
+        self._seen.add((normalized, target))
+        self.aliases.append(normalized)
+        self.targets.append(target)
+        self.cas.append(cas or "")
+        self._postings = None
+
+    def _build(self):
+        postings = defaultdict(list)
+        for entry, alias in enumerate(self.aliases):
+            for trigram in trigrams(alias):
+                postings[trigram].append(entry)
+        self._postings = {trigram: np.array(entries, dtype=np.int32) for trigram, entries in postings.items()}
+        self._sizes = np.array([len(trigrams(alias)) for alias in self.aliases], dtype=float)
+        self._exact = defaultdict(list)
+        for entry, alias in enumerate(self.aliases):
+            self._exact[alias].append(entry)
+
+    def match(self, query, limit=10, min_score=0.3):
+        """
+        Ranked matches of a name in any spelling.
+
+        Parameters:
+            query (str): Name, alias, formula or CAS number as typed.
+            limit (int): Maximum number of components returned.
+            min_score (float): Minimum trigram similarity (0-1).
+
+        Returns:
+            list of dict: name (canonical), alias (normalized alias that
+            matched), cas and score, best first; one entry per component.
+        """
+        if self._postings is None:
+            self._build()
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        query_trigrams = trigrams(normalized)
+        lists = [self._postings[t] for t in query_trigrams if t in self._postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.aliases))
+        scores = 2 * shared / (len(query_trigrams) + self._sizes)
+        for entry in self._exact.get(normalized, ()):
+            scores[entry] = 2.0  # Exact matches first
+
+        candidates = np.flatnonzero(scores >= min_score)
+        if len(candidates) > 20 * limit:
+            candidates = candidates[np.argpartition(-scores[candidates], 20 * limit)[:20 * limit]]
+        ranked = sorted(
+            candidates,
+            key=lambda e: (-scores[e], not self.aliases[e].startswith(normalized), len(self.aliases[e])),
+        )
+
+        matches, seen = [], set()
+        for entry in ranked:
+            target = self.targets[entry]
+            if target in seen:
+                continue
+            seen.add(target)
+            matches.append({
+                "name": target,
+                "alias": self.aliases[entry],
+                "cas": self.cas[entry],
+                "score": min(1.0, float(scores[entry])),
+            })
+            if len(matches) == limit:
+                break
+        return matches
+
+    def names(self, query, limit=20):
+        """Canonical names matching `query`, best first (for the combobox type-ahead)."""
+        return [match["name"] for match in self.match(query, limit)]
+
+    def best(self, query, min_score=0.6):
+        """The best canonical name for `query`, or None if nothing is close enough."""
+        matches = self.match(query, limit=1, min_score=min_score)
+        return matches[0]["name"] if matches else None
+
+    @classmethod
+    def build(cls, config_file=CONFIG_FILE, material_cas_file=MATERIAL_CAS_FILE, synonyms=True):
+        """
+        Index the components of components_config.json (name and formula),
+        archives/materialcas.csv (name and CAS number) and, with `synonyms`,
+        the `chemicals` synonyms of every component with a known CAS number.
+        Components sharing a CAS number get the canonical name seen first,
+        so the configured names win.
+
+        Only the synonyms of known components are taken: the whole
+        `chemicals` name list has close to a million entries.
+        """
+        index = cls()
+        canonical_by_cas = {}
+        components = []  # (name, formula, cas)
+
+        if os.path.exists(config_file):
+            with open(config_file, "r") as file:
+                components.extend((name, formula, None) for name, formula in json.load(file).items())
+        if os.path.exists(material_cas_file):
+            with open(material_cas_file, mode="r", encoding="utf-8-sig") as file:
+                components.extend(
+                    (row["component_name"].strip().upper(), None, row["CAS RN"].strip() or None)
+                    for row in csv.DictReader(file)
+                )
+
+        if synonyms:
+            from chemicals.identifiers import CAS_from_any, pubchem_db
+
+        for name, formula, cas in components:
+            if cas is None and synonyms:
+                try:
+                    cas = CAS_from_any(formula or name)
+                except Exception:
+                    cas = None
+            target = canonical_by_cas.setdefault(cas, name) if cas else name
+            index.add(name, target, cas)
+            if formula:
+                index.add(formula, target, cas)
+            if cas:
+                index.add(cas, target, cas)
+
+        if synonyms:
+            for cas, target in canonical_by_cas.items():
+                metadata = pubchem_db.search_CAS(cas)
+                if not metadata:  # search_CAS returns False for unknown numbers
+                    continue
+                for alias in [metadata.common_name, metadata.iupac_name, metadata.formula, *metadata.synonyms]:
+                    if alias:
+                        index.add(alias, target, cas)
+        index._build()
+        return index
+
+
+def clean_names(names, index=None, min_score=0.6):
+    """Map raw component names to canonical names (None where nothing matches well enough)."""
+    index = index or NameIndex.build()
+    return {name: index.best(name, min_score) for name in set(names)}
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Usage: python name_index.py "hydrogen sulfide" n-pentane ...
+    start = time.perf_counter()
+    INDEX = NameIndex.build()
+    print(f"Indexed {len(INDEX.aliases)} aliases in {time.perf_counter() - start:.2f} s")
+    for query in sys.argv[1:]:
+        start = time.perf_counter()
+        matches = INDEX.match(query, limit=5)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"{query} ({elapsed:.0f} us):")
+        for match in matches:
+            print(f"    {match['score']:.2f}  {match['name']}  ({match['alias']}, {match['cas']})")
@@ -0,0 +1,113 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from recipe_defaults import CONFIG_FILE, MATERIAL_CAS_FILE, SNAPSHOT_FILE
+
+PROPERTY_FIELDS = ["Tc", "Pc", "Vc", "omega", "MW"]  # K, Pa, m3/mol, -, g/mol
+
+
+def _key(text):
+    return str(text).strip().encode("utf-8")
+
+
+def build_snapshot(path=SNAPSHOT_FILE, config_file=CONFIG_FILE, material_cas_file=MATERIAL_CAS_FILE):
+    """
+    Extract Tc, Pc, Vc, omega, MW and CAS of our components from `chemicals`
+    into a .npy snapshot.
+
+    The snapshot is one structured array sorted by lookup key, with one row
+    per component name (upper case), formula and CAS number, so a lookup is a
+    binary search over the memory-mapped key column. Missing properties are
+    stored as NaN.
+
+    Returns:
+        int: Number of components in the snapshot.
+    """
+    from chemicals import CAS_from_any, MW, Pc, Tc, Vc, omega
+    from chemicals.identifiers import search_chemical
+
+    components = []  # (name, formula or None, CAS or None)
+    if os.path.exists(config_file):
+        with open(config_file, "r") as file:
+            components.extend((name, formula, None) for name, formula in json.load(file).items())
+    if os.path.exists(material_cas_file):
+        with open(material_cas_file, mode="r", encoding="utf-8-sig") as file:
+            components.extend((row["component_name"], None, row["CAS RN"].strip() or None)
+                              for row in csv.DictReader(file))
+
+    rows = {}  # key -> (CAS, properties); the first component claiming a key keeps it
+    count = 0
+    for name, formula, cas in components:
+        try:
+            cas = cas or CAS_from_any(formula or name)
+            formula = formula or search_chemical(cas).formula
+        except Exception:
+            continue
+        values = tuple(np.nan if value is None else float(value)
+                       for value in (Tc(cas), Pc(cas), Vc(cas), omega(cas), MW(cas)))
+        count += 1
+        for key in (name.strip().upper(), formula, cas):
+            if key:
+                rows.setdefault(_key(key), (cas, values))
+
+    keys = sorted(rows)
+    dtype = [("key", f"S{max(map(len, keys))}"), ("cas", "S12")] + [(field, "f8") for field in PROPERTY_FIELDS]
+    snapshot = np.array([(key, rows[key][0].encode("ascii"), *rows[key][1]) for key in keys], dtype=dtype)
+    np.save(path, snapshot)
+    return count
+
+
+class PropertySnapshot:
+    """
+    Component properties from a snapshot written by `build_snapshot`.
+
+    The file is memory-mapped, so opening it costs next to nothing and a
+    lookup reads only the pages its binary search touches.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        self.data = np.load(path, mmap_mode="r")
+        self.keys = self.data["key"]
+
+    def _row(self, component):
+        for key in {_key(component), _key(component).upper()}:
+            index = int(np.searchsorted(self.keys, key))
+            if index < len(self.keys) and self.keys[index] == key:
+                return self.data[index]
+        return None
+
+    def get(self, component):
+        """CAS and properties (Tc, Pc, Vc, omega, MW) of a component by name, formula or CAS, or None."""
+        row = self._row(component)
+        if row is None:
+            return None
+        result = {"cas": row["cas"].decode("ascii")}
+        result.update((field, float(row[field])) for field in PROPERTY_FIELDS)
+        return result
+
+    def critical_properties(self, component):
+        """(Tc, Pc, omega) of a component, or None if it is not in the snapshot or incomplete."""
+        row = self._row(component)
+        if row is None:
+            return None
+        properties = (float(row["Tc"]), float(row["Pc"]), float(row["omega"]))
+        return None if np.isnan(properties).any() else properties
+
+    def molar_mass(self, component):
+        row = self._row(component)
+        return None if row is None or np.isnan(row["MW"]) else float(row["MW"])
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    """The snapshot at `path`, or None if it has not been built."""
+    return PropertySnapshot(path) if os.path.exists(path) else None
+
+
+if __name__ == "__main__":
+    # Build step: python property_snapshot.py (rerun after changing the component lists)
+    count = build_snapshot()
+    print(f"Snapshot {SNAPSHOT_FILE}: {count} components, {os.path.getsize(SNAPSHOT_FILE) / 1024:.0f} kB")
@@ -1,51 +1,169 @@
+import time
+
+STARTUP_T0 = time.perf_counter()
+
 import customtkinter as ctk
-import numpy as np
-from CTkMessagebox import CTkMessagebox
-from molmass import Formula
-from chemicals import Tc, Pc, omega, CAS_from_any
-import os
+import importlib
 import json
+import os
+import queue
+import sys
 import tkinter.filedialog as fd
-
-# Default constants
-DEFAULT_CONSTANTS = {
-    "cyl_volume": 40,  # L
-    "fill_pressure": 150,  # bar
-    "gas_constant": 0.08314,  # L.Bar/mol.g.K
-    "temperature": 293,  # K
-    "z_mix": 1,  # This will be replaced with calculated Z later
-}
-
-CONFIG_FILE = "components_config.json"
-
-if os.path.exists(CONFIG_FILE):
-    with open(CONFIG_FILE, "r") as file:
-        COMPONENTS = json.load(file)
-else:
-    COMPONENTS = {
-        "OXYGEN": "O2",
-        "NITROGEN": "N2",
-        "WATER": "H2O"
-    }
-    with open(CONFIG_FILE, "w") as file:
-        json.dump(COMPONENTS, file, indent=4)
+from concurrent.futures import ThreadPoolExecutor
+
+from component_catalogue import ComponentCatalogue
+from component_table import ComponentTable
+from recipe_defaults import CONFIG_FILE, DEFAULT_CONSTANTS
+
+IMPORTS_DONE = time.perf_counter()
+
+# numpy, molmass, recipe_engine and CTkMessagebox are imported lazily: the
+# calculation modules on the worker thread right after the window is shown,
+# the message box on first use. chemicals is only loaded for components
+# missing from the property snapshot and for the name index.
+WARM_UP_MODULES = ["numpy", "molmass", "recipe_engine"]
+
+POLL_INTERVAL_MS = 50  # How often the Tk thread checks for finished calculations
+DEBOUNCE_MS = 300  # Quiet time after the last edit before recalculating
+
+COMPONENTS = {}  # Preset components (name -> formula) shown on start-up
+CATALOGUE = None
+
+
+def load_components():
+    """
+    Fill COMPONENTS with the preset components of the catalogue. On the first
+    start the catalogue is imported from components_config.json and
+    archives/materialcas.csv; returns True in that case.
+    """
+    global CATALOGUE
+    CATALOGUE = ComponentCatalogue()
+    imported = CATALOGUE.initialize(fill_properties=False)
+    if not CATALOGUE.formulas(preset_only=True):
+        for name, formula in {"OXYGEN": "O2", "NITROGEN": "N2", "WATER": "H2O"}.items():
+            CATALOGUE.add_component(name, formula=formula, aliases=[formula], preset=True)
+    COMPONENTS.update(CATALOGUE.formulas(preset_only=True))
+    if not os.path.exists(CONFIG_FILE):
+        save_components_to_file()
+    return imported
 
 def save_components_to_file():
+    """
+    Export the presets to components_config.json. The catalogue is the source
+    of truth in the GUI; the command-line tools (batch_recipe, fill_planner,
+    recipe_engine, the property snapshot and name index builds) read the JSON.
+    """
     with open(CONFIG_FILE, "w") as file:
         json.dump(COMPONENTS, file, indent=4)
 
+def component_formula(name):
+    """Formula of a preset or catalogue component; unknown names are used as formulas."""
+    if name in COMPONENTS:
+        return COMPONENTS[name]
+    entry = CATALOGUE.get(name) if name else None
+    return entry["formula"] if entry and entry["formula"] else name
+
+def show_message(**kwargs):
+    """CTkMessagebox, imported on first use."""
+    from CTkMessagebox import CTkMessagebox
+
+    return CTkMessagebox(**kwargs)
+
 class GasCalculatorApp:
-    def __init__(self, root):
+    def __init__(self, root, profile_startup=False):
         self.root = root
+        self.profile_startup = profile_startup
+        self.startup_timings = {"imports": IMPORTS_DONE - STARTUP_T0}
         self.row = 0
         self.col = 0
         self.entries = {}
-        self.component_widgets = {}  # {component_name: {widget_name: widget, ...}}
-        self.component_combobox_widgets = {}
+
+        # Calculations run on a single worker thread; results come back through
+        # a queue that the Tk thread polls with root.after. Every request carries
+        # the input generation it was made for, and results for older
+        # generations are dropped.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.results = queue.Queue()
+        self.calc_generation = 0
+        self.pending_calculations = 0
+        # Only used from the worker thread; keeps intermediate results so an
+        # edit recomputes just the parts of the recipe that depend on it.
+        self.recipe_graph = None
+        self.debounce_id = None
+        # Fuzzy name index, built on its own thread after warm_up (loading the
+        # chemicals synonyms takes seconds); prefix search in the catalogue until then
+        self.index_executor = ThreadPoolExecutor(max_workers=1)
+        self.name_index = None
+        # Last recipe shown and the input generation it belongs to; saved with
+        # the mixture while the inputs have not changed since.
+        self.last_recipe = None
+        self.last_recipe_generation = -1
 
         self.root.title("Gas Weight Calculator")
         self.root.iconbitmap("images/SII.ico")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.catalogue_imported = load_components()
         self.setup_ui()
+        self.root.after_idle(self.on_window_shown)
+
+    def on_window_shown(self):
+        """Start loading the calculation modules once the window is up."""
+        self.startup_timings["window shown"] = time.perf_counter() - STARTUP_T0
+        self.executor.submit(self.warm_up)
+        if self.profile_startup:
+            self.root.after(POLL_INTERVAL_MS, self.report_startup)
+
+    def warm_up(self):
+        """
+        Runs on the worker thread before any calculation: import the heavy
+        modules and look up the configured components, so the first
+        calculation does not pay for loading the chemicals tables. After the
+        first-start import, the catalogue's missing properties are filled in
+        here too.
+        """
+        for name in WARM_UP_MODULES:
+            start = time.perf_counter()
+            importlib.import_module(name)
+            self.startup_timings[f"import {name}"] = time.perf_counter() - start
+        from recipe_engine import RecipeGraph, add_property_source, component_properties
+        from molar_mass_cache import molar_masses
+
+        start = time.perf_counter()
+        if self.catalogue_imported:
+            CATALOGUE.fill_properties()
+            self.startup_timings["catalogue properties"] = time.perf_counter() - start
+        add_property_source(CATALOGUE.critical_properties)
+
+        start = time.perf_counter()
+        self.recipe_graph = RecipeGraph()
+        molar_masses(list(COMPONENTS.values()))
+        for name, formula in COMPONENTS.items():
+            try:
+                component_properties(name, formula)
+            except Exception:
+                pass  # Reported when the component is used in a calculation
+        self.startup_timings["component lookups"] = time.perf_counter() - start
+        self.startup_timings["ready"] = time.perf_counter() - STARTUP_T0
+
+        # Only needed for the type-ahead: built on its own thread once the
+        # calculation is ready, so calculations do not queue behind it
+        self.index_executor.submit(self.build_name_index)
+
+    def build_name_index(self):
+        """Runs on the index thread: load the chemicals synonyms into the fuzzy name index."""
+        from name_index import NameIndex
+
+        start = time.perf_counter()
+        self.name_index = NameIndex.build()
+        self.startup_timings["name index"] = time.perf_counter() - start
+
+    def report_startup(self):
+        if "name index" not in self.startup_timings:
+            self.root.after(POLL_INTERVAL_MS, self.report_startup)
+            return
+        print("--- Startup timings ---")
+        for step, seconds in self.startup_timings.items():
+            print(f"{step:>20}: {seconds * 1000:8.1f} ms")
 
     def setup_ui(self):
         self.setup_constants_section()
@@ -62,125 +180,98 @@ class GasCalculatorApp:
             self.entries["constants"][label] = entry
 
     def setup_component_section(self):
-        headers = ["Component", "Z", "Percentage (%)", "Z x comp", "Molar Mass (g/mol)", "Weight (g)"]
-        for col, text in enumerate(headers):
-            ctk.CTkLabel(self.root, text=text).grid(
-                row=self.row, column=self.col + col, padx=10, pady=5
-            )
-        self.component_table_start_row = self.row + 1  # Save where the table starts
-        self.row += 1
+        self.component_table = ComponentTable(
+            self.root, list(COMPONENTS.keys()), on_change=self.on_input_changed,
+            search=self.search_components, fg_color="transparent"
+        )
+        self.component_table.grid(row=self.row, column=self.col, columnspan=6, rowspan=4, sticky="nw")
+
+    def search_components(self, text, limit=20):
+        """
+        Type-ahead for the component selectors: prefix matches from the
+        catalogue (which has the components added in this session), followed
+        by fuzzy matches once the name index is built.
+        """
+        names = CATALOGUE.search(text, limit)
+        if self.name_index is not None:
+            seen = {name.casefold() for name in names}
+            for name in self.name_index.names(text, limit):
+                if name.casefold() not in seen:
+                    seen.add(name.casefold())
+                    names.append(name)
+        return names[:limit]
 
     def setup_buttons(self):
         ctk.CTkButton(
             self.root, text="Add Component", command=self.add_new_component
-        ).grid(row=self.row - 1, column=self.col + 6, padx=10, pady=10)
+        ).grid(row=self.row, column=self.col + 6, padx=10, pady=10)
 
         ctk.CTkButton(
             self.root, text="Calculate", command=self.calculate
-        ).grid(row=self.row - 1, column=self.col + 7, padx=10, pady=10)
+        ).grid(row=self.row, column=self.col + 7, padx=10, pady=10)
 
         ctk.CTkButton(
             self.root, text="Save Mixture", command=self.save_mixture
-        ).grid(row=self.row - 1, column=self.col + 8, padx=10, pady=10)
+        ).grid(row=self.row, column=self.col + 8, padx=10, pady=10)
 
         ctk.CTkButton(
             self.root, text="Load Mixture", command=self.load_mixture
-        ).grid(row=self.row - 1, column=self.col + 9, padx=10, pady=10)
+        ).grid(row=self.row, column=self.col + 9, padx=10, pady=10)
 
         self.total_weight_label = ctk.CTkLabel(self.root, text="Total Weight: 0.0000 g")
-        self.total_weight_label.grid(row=self.row, column=self.col + 6, padx=10, pady=5)
-        self.row += 1
+        self.total_weight_label.grid(row=self.row + 1, column=self.col + 6, padx=10, pady=5)
+
+        self.progress_bar = ctk.CTkProgressBar(self.root, mode="indeterminate", width=150)
+        self.progress_bar.grid(row=self.row + 2, column=self.col + 6, padx=10, pady=5)
+        self.progress_bar.grid_remove()
+        self.status_label = ctk.CTkLabel(self.root, text="")
+        self.status_label.grid(row=self.row + 3, column=self.col + 6, padx=10, pady=5)
+        self.row += 4
 
     def create_label_entry(self, label_text, default_value):
         ctk.CTkLabel(self.root, text=label_text).grid(row=self.row, column=self.col, padx=10, pady=5)
         entry = ctk.CTkEntry(self.root)
         entry.insert(0, default_value)
         entry.grid(row=self.row, column=self.col + 1, padx=10, pady=5)
+        entry.bind("<KeyRelease>", self.on_input_changed, add="+")
         self.row += 1
         return entry
 
     def add_initial_components(self):
-        # Start adding components at the correct row
-        self.next_component_row = self.component_table_start_row
-        for component in COMPONENTS:
-            self.add_component_widgets(component)
-
-    def add_component_widgets(self, component_name):
-        row = self.next_component_row
-        self.next_component_row += 1
-
-        component_selector = ctk.CTkComboBox(
-            self.root, values=list(COMPONENTS.keys()), width=150
-        )
-        component_selector.set(component_name)
-        component_selector.grid(row=row, column=self.col, padx=10, pady=5)
-
-        z_comp_factor = ctk.CTkLabel(self.root, text="0.0000")
-        z_comp_factor.grid(row=row, column=self.col + 1, padx=10, pady=5)
-
-        percentage_entry = ctk.CTkEntry(self.root)
-        percentage_entry.insert(0, "0.0")
-        percentage_entry.grid(row=row, column=self.col + 2, padx=10, pady=5)
-
-        z_x_comp = ctk.CTkLabel(self.root, text="0.0000")
-        z_x_comp.grid(row=row, column=self.col + 3, padx=10, pady=5)
-
-        molar_mass_label = ctk.CTkLabel(self.root, text="0.0000 g/mol")
-        molar_mass_label.grid(row=row, column=self.col + 4, padx=10, pady=5)
-
-        weight_label = ctk.CTkLabel(self.root, text="0.0000 g")
-        weight_label.grid(row=row, column=self.col + 5, padx=10, pady=5)
-
-        delete_button = ctk.CTkButton(
-            self.root, text="Delete", command=lambda: self.delete_component(component_name)
-        )
-        delete_button.grid(row=row, column=self.col + 7, padx=10, pady=5)
-
-        self.component_widgets[component_name] = {
-            "selector": component_selector,
-            "z": z_comp_factor,
-            "percentage": percentage_entry,
-            "z_x_comp": z_x_comp,
-            "molar_mass": molar_mass_label,
-            "weight": weight_label,
-            "delete_button": delete_button,
-            "row": row
-        }
-        self.component_combobox_widgets[component_name] = component_selector
-
-    def delete_component(self, component_name):
-        """Delete a component row from the UI only."""
-        widgets = self.component_widgets.get(component_name, {})
-        for key, widget in widgets.items():
-            if key != "row":
-                widget.grid_forget()
-                widget.destroy()
-        # Remove from tracking dicts
-        self.component_widgets.pop(component_name, None)
-        self.component_combobox_widgets.pop(component_name, None)
+        self.component_table.set_rows((component, "0.0") for component in COMPONENTS)
 
     def add_new_component(self):
         def submit_new_component():
             name = new_name_entry.get().strip().upper()
             formula = new_formula_entry.get().strip()
             if not name or not formula:
-                CTkMessagebox(title="Input Error",
-                              message="Both name and formula are required!",
-                              icon="cancel")
+                show_message(title="Input Error",
+                             message="Both name and formula are required!",
+                             icon="cancel")
                 return
             if name in COMPONENTS:
-                CTkMessagebox(title="Input Error",
-                              message="Component already exists!",
-                              icon="cancel")
+                show_message(title="Input Error",
+                             message="Component already exists!",
+                             icon="cancel")
+                return
+            from molmass import Formula, FormulaError
+
+            try:
+                Formula(formula).mass
+            except FormulaError as e:
+                show_message(title="Input Error",
+                             message=f"Invalid formula '{formula}': {e}",
+                             icon="cancel")
                 return
+            CATALOGUE.add_component(name, formula=formula, aliases=[formula], preset=True)
             COMPONENTS[name] = formula
             save_components_to_file()
             self.update_combobox_values()
-            self.add_component_widgets(name)
+            self.component_table.add_row(name)
             popup.destroy()
-            CTkMessagebox(title="Success",
-                          message=f"Component '{name}' added successfully!",
-                          icon="check")
+            show_message(title="Success",
+                         message=f"Component '{name}' added successfully!",
+                         icon="check")
 
         popup = ctk.CTkToplevel(self.root)
         popup.title("Add New Component")
@@ -199,94 +290,130 @@ class GasCalculatorApp:
         )
 
     def update_combobox_values(self):
-        component_names = list(COMPONENTS.keys())
-        for combobox in self.component_combobox_widgets.values():
-            combobox.configure(values=component_names)
-
-    def calculate_mixture_props(self, components, mole_fractions):
-        if len(components) != len(mole_fractions):
-            raise ValueError("Number of components must match number of mole fractions.")
-        if not np.isclose(sum(mole_fractions), 1.0, atol=1e-6):
-            raise ValueError("Mole fractions must sum to 1.")
-
-        T_crit_mix = sum(x * Tc(CAS_from_any(c)) for c, x in zip(components, mole_fractions))
-        P_crit_mix = 0
-        for i, (c1, x_i) in enumerate(zip(components, mole_fractions)):
-            for j, (c2, x_j) in enumerate(zip(components, mole_fractions)):
-                if i <= j:
-                    P_crit_mix += 2 * x_i * x_j * np.sqrt(Pc(CAS_from_any(c1)) * Pc(CAS_from_any(c2)))
-        P_crit_mix /= 2
-        P_crit_mix /= 100000
-
-        omega_mix = sum(x * omega(CAS_from_any(c)) for c, x in zip(components, mole_fractions))
-        return T_crit_mix, P_crit_mix, omega_mix
-
-    def calculate(self):
-        components = []
-        mole_fractions = []
-        for component_name, widget_set in self.component_widgets.items():
-            selected_component = widget_set["selector"].get()
-            try:
-                mole_fraction = float(widget_set["percentage"].get()) / 100
-            except ValueError:
-                mole_fraction = 0.0
-            components.append(COMPONENTS.get(selected_component, selected_component))
-            mole_fractions.append(mole_fraction)
-
-        if not np.isclose(sum(mole_fractions), 1.0, atol=1e-6):
-            CTkMessagebox(
-                title="Input Error",
-                message="Mole fractions must sum to 1.",
-                icon="cancel"
-            )
-            return
-
-        R = float(self.entries["constants"]["gas_constant"].get())
-        T = float(self.entries["constants"]["temperature"].get())
-        P = float(self.entries["constants"]["fill_pressure"].get())
-        V = float(self.entries["constants"]["cyl_volume"].get())
-
-        total_moles = (P * V) / (R * T)
-        T_crit_mix, P_crit_mix, omega_mix = self.calculate_mixture_props(components, mole_fractions)
-
-        def calculate_Z_pitzer(P, T, T_crit, P_crit, omega_value):
-            Tr = T / T_crit
-            Pr = P / P_crit
-            B0 = 0.083 - 0.422 / (Tr ** 1.6)
-            B1 = 0.139 - 0.172 / (Tr ** 4.2)
-            B = B0 + omega_value * B1
-            return 1 + B * (Pr / Tr)
-
-        Z_mix = calculate_Z_pitzer(P, T, T_crit_mix, P_crit_mix, omega_mix)
-        self.entries["constants"]["z_mix"].delete(0, ctk.END)
-        self.entries["constants"]["z_mix"].insert(0, f"{Z_mix:.4f}")
-
-        total_moles /= Z_mix
-
-        total_weight = 0.0
-        for component_name, widget_set in self.component_widgets.items():
-            selected_component = widget_set["selector"].get()
-            component_formula = COMPONENTS.get(selected_component, selected_component)
-            molar_mass = Formula(component_formula).mass
-            widget_set["molar_mass"].configure(text=f"{molar_mass:.4f} g/mol")
-            moles_component = total_moles * mole_fractions[components.index(component_formula)]
-            weight = moles_component * molar_mass
-            widget_set["weight"].configure(text=f"{weight:.4f} g")
-            total_weight += weight
+        self.component_table.update_component_names(list(COMPONENTS.keys()))
 
-        self.total_weight_label.configure(text=f"Total Weight: {total_weight:.4f} g")
-
-    def save_mixture(self):
-        """Save the current mixture (constants and components) to a JSON file."""
+    def get_mixture(self):
+        """Collect the current constants and components in the mixture file format."""
         mixture = {
             "constants": {k: self.entries["constants"][k].get() for k in self.entries["constants"]},
             "components": []
         }
-        for component_name, widget_set in self.component_widgets.items():
+        for name, percentage in self.component_table.get_rows():
             mixture["components"].append({
-                "name": widget_set["selector"].get(),
-                "percentage": widget_set["percentage"].get()
+                "name": name,
+                "percentage": percentage
             })
+        return mixture
+
+    def on_input_changed(self, *_):
+        """
+        Invalidate running calculations, whose results no longer match the
+        inputs, and recalculate once the inputs have been quiet for DEBOUNCE_MS.
+        """
+        self.calc_generation += 1
+        if self.debounce_id is not None:
+            self.root.after_cancel(self.debounce_id)
+        self.debounce_id = self.root.after(DEBOUNCE_MS, self.auto_calculate)
+
+    def auto_calculate(self):
+        self.debounce_id = None
+        self.calculate(interactive=False)
+
+    def calculate(self, interactive=True):
+        """
+        Collect the inputs on the Tk thread and hand them to the worker.
+
+        Errors of interactive (button) calculations open a message box; those
+        of automatic recalculations are only shown in the status label.
+        """
+        if self.debounce_id is not None:
+            self.root.after_cancel(self.debounce_id)
+            self.debounce_id = None
+        self.calc_generation += 1
+        generation = self.calc_generation
+        mixture = self.get_mixture()
+        components = self.current_components()
+
+        self.pending_calculations += 1
+        self.progress_bar.grid()
+        self.progress_bar.start()
+        self.status_label.configure(text="Calculating...")
+        self.executor.submit(self.calculate_in_background, generation, mixture, components, interactive)
+        if self.pending_calculations == 1:
+            self.root.after(POLL_INTERVAL_MS, self.poll_results)
+
+    def calculate_in_background(self, generation, mixture, components, interactive):
+        """Runs on the worker thread; must not touch any widget."""
+        if generation != self.calc_generation:
+            self.results.put((generation, None, None, interactive))  # Superseded before it started
+            return
+        try:
+            if self.recipe_graph is None:  # warm_up failed
+                from recipe_engine import RecipeGraph
+                self.recipe_graph = RecipeGraph()
+            recipe = self.recipe_graph.update(mixture, components)
+        except Exception as e:
+            self.results.put((generation, None, e, interactive))
+        else:
+            self.results.put((generation, recipe, None, interactive))
+
+    def poll_results(self):
+        while True:
+            try:
+                generation, recipe, error, interactive = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending_calculations -= 1
+            if generation != self.calc_generation:
+                continue
+            if error is not None and interactive:
+                show_message(
+                    title="Input Error" if isinstance(error, ValueError) else "Calculation Error",
+                    message=str(error),
+                    icon="cancel"
+                )
+                self.status_label.configure(text="")
+            elif error is not None:
+                self.status_label.configure(text=str(error))
+            elif recipe is not None:
+                self.show_recipe(recipe)
+                self.last_recipe, self.last_recipe_generation = recipe, generation
+                self.status_label.configure(text="")
+
+        if self.pending_calculations:
+            self.root.after(POLL_INTERVAL_MS, self.poll_results)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.grid_remove()
+
+    def show_recipe(self, recipe):
+        self.entries["constants"]["z_mix"].delete(0, ctk.END)
+        self.entries["constants"]["z_mix"].insert(0, f"{recipe['z_mix']:.4f}")
+
+        self.component_table.set_results(recipe["components"])
+
+        self.total_weight_label.configure(text=f"Total Weight: {recipe['total_weight']:.4f} g")
+
+    def on_close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.index_executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+    def current_components(self):
+        """Name -> formula of the components in the table."""
+        return {name: component_formula(name) for name, _ in self.component_table.get_rows()}
+
+    def save_mixture(self):
+        """
+        Save the current mixture (constants and components) to a JSON file,
+        together with its content hash and the calculated results if they
+        are up to date with the inputs.
+        """
+        mixture = self.get_mixture()
+        if self.last_recipe is not None and self.last_recipe_generation == self.calc_generation:
+            from recipe_engine import with_results
+
+            mixture = with_results(mixture, self.last_recipe, self.current_components())
         file_path = fd.asksaveasfilename(
             defaultextension=".json",
             filetypes=[("JSON files", "*.json")],
@@ -295,10 +422,14 @@ class GasCalculatorApp:
         if file_path:
             with open(file_path, "w") as f:
                 json.dump(mixture, f, indent=4)
-            CTkMessagebox(title="Success", message="Mixture saved!", icon="check")
+            show_message(title="Success", message="Mixture saved!", icon="check")
 
     def load_mixture(self):
-        """Load a mixture from a JSON file and update the UI."""
+        """
+        Load a mixture from a JSON file and update the UI. Results stored in
+        the file are shown directly when they are still valid; otherwise the
+        mixture is recalculated.
+        """
         file_path = fd.askopenfilename(
             defaultextension=".json",
             filetypes=[("JSON files", "*.json")],
@@ -313,21 +444,26 @@ class GasCalculatorApp:
             if k in self.entries["constants"]:
                 self.entries["constants"][k].delete(0, ctk.END)
                 self.entries["constants"][k].insert(0, v)
-        # Remove existing component rows
-        for comp in list(self.component_widgets.keys()):
-            self.delete_component(comp)
-        # Add loaded components
-        for comp in mixture.get("components", []):
-            name = comp["name"]
-            if name not in self.component_widgets:
-                self.add_component_widgets(name)
-            self.component_widgets[name]["selector"].set(name)
-            self.component_widgets[name]["percentage"].delete(0, ctk.END)
-            self.component_widgets[name]["percentage"].insert(0, comp["percentage"])
+        # Replace the component rows
+        self.component_table.set_rows(
+            (comp["name"], comp["percentage"]) for comp in mixture.get("components", [])
+        )
+
+        from recipe_engine import cached_recipe
+
+        recipe = cached_recipe(mixture, self.current_components())
+        if recipe is not None:
+            if self.debounce_id is not None:
+                self.root.after_cancel(self.debounce_id)
+                self.debounce_id = None
+            self.show_recipe(recipe)
+            self.last_recipe, self.last_recipe_generation = recipe, self.calc_generation
 
 if __name__ == "__main__":
+    # python recipe_ctkgui.py --profile-startup prints how long the imports,
+    # the window and the background warm-up took.
     ctk.set_appearance_mode("dark")
     ctk.set_default_color_theme("green")
     root = ctk.CTk()
-    app = GasCalculatorApp(root)
+    app = GasCalculatorApp(root, profile_startup="--profile-startup" in sys.argv)
     root.mainloop()
\ No newline at end of file
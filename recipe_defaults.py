@@ -0,0 +1,17 @@
+# Constants shared by the recipe GUI, engine and tools. Kept free of heavy
+# imports so the GUI can read them before numpy/chemicals are loaded.
+import os
+
+# Default constants
+DEFAULT_CONSTANTS = {
+    "cyl_volume": 40,  # L
+    "fill_pressure": 150,  # bar
+    "gas_constant": 0.08314,  # L.Bar/mol.g.K
+    "temperature": 293,  # K
+    "z_mix": 1,  # This will be replaced with calculated Z later
+}
+
+CONFIG_FILE = "components_config.json"
+CATALOGUE_FILE = "components.db"
+SNAPSHOT_FILE = "component_properties.npy"  # Built by property_snapshot.py
+MATERIAL_CAS_FILE = os.path.join("archives", "materialcas.csv")  # Component names and CAS numbers
@@ -0,0 +1,312 @@
+import hashlib
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from molar_mass_cache import molar_masses
+from property_snapshot import load_snapshot
+from recipe_defaults import CONFIG_FILE, DEFAULT_CONSTANTS
+
+ENGINE_VERSION = 2  # Bump whenever a change alters computed results; invalidates cached results
+MIXTURE_FORMAT_VERSION = 2  # Version 1: inputs only; version 2 adds hash and results
+
+# Callables component -> (Tc, Pc, omega) or None, asked before `chemicals`.
+# The memory-mapped property snapshot comes first when it has been built.
+_property_sources = []
+_snapshot = load_snapshot()
+if _snapshot is not None:
+    _property_sources.append(_snapshot.critical_properties)
+
+
+def add_property_source(source):
+    """Register a property source (e.g. ComponentCatalogue.critical_properties) ahead of `chemicals`."""
+    _property_sources.append(source)
+    component_properties.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def component_properties(name, formula=None):
+    """
+    Critical temperature (K), critical pressure (Pa) and acentric factor of a
+    component given by name or CAS, falling back to its formula. Isomers
+    share a formula, so every source is asked for the name first. Cached, so
+    `chemicals` is only asked once per component. `chemicals` itself is
+    imported on first use, because loading it costs more than everything
+    else in the engine.
+    """
+    keys = [name] if formula in (None, name) else [name, formula]
+    for key in keys:
+        for source in _property_sources:
+            properties = source(key)
+            if properties is not None:
+                return properties
+
+        from chemicals import Tc, Pc, omega, CAS_from_any
+
+        try:
+            cas = CAS_from_any(key)
+        except ValueError:
+            if key is keys[-1]:
+                raise
+            continue
+        return Tc(cas), Pc(cas), omega(cas)
+
+
+def calculate_mixture_props(components, mole_fractions, formulas=None):
+    """
+    Calculate mixture properties (Tc, Pc, omega) using mixing rules.
+
+    Parameters:
+        components (list of str): Component names (or CAS numbers).
+        mole_fractions (list of float): Mole fraction of each component.
+        formulas (list of str): Formulas, used for names no source knows.
+
+    Returns:
+        tuple: Mixture critical temperature (K), pressure (bar) and acentric factor.
+    """
+    if len(components) != len(mole_fractions):
+        raise ValueError("Number of components must match number of mole fractions.")
+    return mix_properties(lookup_properties(components, formulas), mole_fractions)
+
+
+def lookup_properties(names, formulas=None):
+    """Array of shape (3, n) with Tc (K), Pc (Pa) and omega of each component (see `component_properties`)."""
+    formulas = formulas or [None] * len(names)
+    return np.array([component_properties(n, f) for n, f in zip(names, formulas)]).reshape(-1, 3).T
+
+
+def mix_properties(properties, mole_fractions):
+    """
+    Apply the mixing rules to component properties from `lookup_properties`.
+    `mole_fractions` may be a 2-D array with one mixture per row.
+    """
+    x = np.asarray(mole_fractions, dtype=float)
+    if not np.allclose(x.sum(axis=-1), 1.0, atol=1e-6):
+        raise ValueError("Mole fractions must sum to 1.")
+
+    T_crit, P_crit, omegas = properties
+
+    T_crit_mix = x @ T_crit
+    # Pc mixing rule: sum over pairs i <= j of x_i * x_j * sqrt(Pc_i * Pc_j)
+    sqrt_P_crit = np.sqrt(P_crit)
+    P_crit_mix = ((x @ sqrt_P_crit) ** 2 + (x ** 2) @ P_crit) / 2
+    P_crit_mix /= 100000  # Convert from Pa to bar
+
+    omega_mix = x @ omegas
+    return T_crit_mix, P_crit_mix, omega_mix
+
+
+def calculate_Z_pitzer(P, T, T_crit, P_crit, omega_value):
+    """
+    Calculate Z using the Pitzer (2nd virial) correlation.
+    """
+    Tr = T / T_crit
+    Pr = P / P_crit
+    B0 = 0.083 - 0.422 / (Tr ** 1.6)
+    B1 = 0.139 - 0.172 / (Tr ** 4.2)
+    B = B0 + omega_value * B1
+    return 1 + B * (Pr / Tr)
+
+
+def _to_float(value, default=None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        if default is None:
+            raise ValueError(f"Invalid number: {value!r}") from None
+        return default
+
+
+def parse_mixture(mixture, components=None):
+    """
+    Turn a mixture dict (as saved by the GUI) into calculation inputs.
+
+    Returns:
+        dict: names and formulas (tuples), fractions (tuple of mole fractions)
+        and the constants cyl_volume, fill_pressure, gas_constant and
+        temperature as floats.
+    """
+    components = components or {}
+    constants = dict(DEFAULT_CONSTANTS, **mixture.get("constants", {}))
+    names = tuple(c["name"] for c in mixture.get("components", []))
+    inputs = {
+        "names": names,
+        "formulas": tuple(components.get(name, name) for name in names),
+        "fractions": tuple(_to_float(c["percentage"], 0.0) / 100 for c in mixture.get("components", [])),
+    }
+    for key in ("cyl_volume", "fill_pressure", "gas_constant", "temperature"):
+        inputs[key] = _to_float(constants[key])
+    return inputs
+
+
+def _recipe_result(names, formulas, fractions, Z_mix, total_moles, masses, moles, weights):
+    return {
+        "z_mix": float(Z_mix),
+        "total_moles": float(total_moles),
+        "total_weight": float(weights.sum()),
+        "components": [
+            {
+                "name": name,
+                "formula": formula,
+                "mole_fraction": float(x),
+                "molar_mass": float(mm),
+                "moles": float(n),
+                "weight": float(w),
+            }
+            for name, formula, x, mm, n, w in zip(names, formulas, fractions, masses, moles, weights)
+        ],
+    }
+
+
+def compute_recipe(mixture, components=None):
+    """
+    Compute the filling recipe of one mixture.
+
+    Parameters:
+        mixture (dict): Mixture in the format written by the GUI's "Save Mixture",
+            {"constants": {...}, "components": [{"name": ..., "percentage": ...}]}.
+            Values may be numbers or strings; missing constants use DEFAULT_CONSTANTS.
+        components (dict): Component name -> formula. Names not found are used as
+            formulas directly.
+
+    Returns:
+        dict: z_mix, total_moles, total_weight and a "components" list with
+        name, formula, mole_fraction, molar_mass, moles and weight per component.
+    """
+    inputs = parse_mixture(mixture, components)
+    P, T = inputs["fill_pressure"], inputs["temperature"]
+    mole_fractions = np.array(inputs["fractions"])
+
+    T_crit_mix, P_crit_mix, omega_mix = calculate_mixture_props(inputs["names"], mole_fractions, inputs["formulas"])
+    Z_mix = calculate_Z_pitzer(P, T, T_crit_mix, P_crit_mix, omega_mix)
+    total_moles = (P * inputs["cyl_volume"]) / (inputs["gas_constant"] * T) / Z_mix
+
+    masses = molar_masses(inputs["formulas"])
+    moles = total_moles * mole_fractions
+    weights = moles * masses
+    return _recipe_result(inputs["names"], inputs["formulas"], mole_fractions, Z_mix, total_moles, masses, moles, weights)
+
+
+def mixture_hash(mixture, components=None):
+    """
+    SHA-256 of the canonical calculation inputs of a mixture: component names,
+    formulas and mole fractions and the numeric constants. Formatting
+    differences ("300" vs 300.0, key order) do not change the hash; the
+    displayed Z does not take part.
+    """
+    canonical = json.dumps(parse_mixture(mixture, components), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def with_results(mixture, recipe, components=None):
+    """
+    Mixture in the versioned file format: the inputs, their hash, the engine
+    version and the computed recipe (see `compute_recipe`) as "results".
+    """
+    return {
+        "version": MIXTURE_FORMAT_VERSION,
+        "engine_version": ENGINE_VERSION,
+        "hash": mixture_hash(mixture, components),
+        "constants": mixture.get("constants", {}),
+        "components": mixture.get("components", []),
+        "results": recipe,
+    }
+
+
+def cached_recipe(mixture, components=None):
+    """
+    The stored results of a mixture file, or None when the file has none or
+    they are stale: older format, other engine version, or inputs (including
+    the component formulas) that no longer match the stored hash.
+    """
+    if mixture.get("version", 1) < MIXTURE_FORMAT_VERSION or "results" not in mixture:
+        return None
+    if mixture.get("engine_version") != ENGINE_VERSION:
+        return None
+    try:
+        if mixture_hash(mixture, components) != mixture.get("hash"):
+            return None
+    except (KeyError, ValueError):
+        return None
+    return mixture["results"]
+
+
+def load_recipe(mixture, components=None):
+    """Recipe of a mixture file: the cached results when still valid, otherwise computed."""
+    recipe = cached_recipe(mixture, components)
+    return recipe if recipe is not None else compute_recipe(mixture, components)
+
+
+class RecipeGraph:
+    """
+    Incremental recipe calculation driven by a dependency graph.
+
+    Each node is recomputed only when one of its inputs changed since the
+    previous `update`: a temperature change redoes Z, the moles and the
+    weights; a percentage change redoes the mixing rules, Z, the moles and
+    the weights but reuses the component properties and molar masses.
+    """
+
+    # node: (dependencies, function of the current values); in topological order
+    NODES = {
+        "properties": (("names", "formulas"), lambda v: lookup_properties(v["names"], v["formulas"])),
+        "molar_masses": (("formulas",), lambda v: molar_masses(v["formulas"])),
+        "mixture_props": (("properties", "fractions"), lambda v: mix_properties(v["properties"], v["fractions"])),
+        "z_mix": (
+            ("mixture_props", "fill_pressure", "temperature"),
+            lambda v: calculate_Z_pitzer(v["fill_pressure"], v["temperature"], *v["mixture_props"]),
+        ),
+        "total_moles": (
+            ("z_mix", "fill_pressure", "cyl_volume", "gas_constant", "temperature"),
+            lambda v: (v["fill_pressure"] * v["cyl_volume"]) / (v["gas_constant"] * v["temperature"]) / v["z_mix"],
+        ),
+        "moles": (("total_moles", "fractions"), lambda v: v["total_moles"] * np.array(v["fractions"])),
+        "weights": (("moles", "molar_masses"), lambda v: v["moles"] * v["molar_masses"]),
+    }
+
+    def __init__(self):
+        self.values = {}
+        self.dirty = set()
+        self.last_recomputed = []
+
+    def update(self, mixture, components=None):
+        """Recompute what changed since the last call and return the recipe (see `compute_recipe`)."""
+        for key, value in parse_mixture(mixture, components).items():
+            if key not in self.values or self.values[key] != value:
+                self.values[key] = value
+                self.dirty.add(key)
+
+        # Nodes stay dirty until a successful update, so after an error
+        # (e.g. fractions not summing to 1) the next call redoes them.
+        recomputed = []
+        for node, (dependencies, function) in self.NODES.items():
+            if node in self.dirty or node not in self.values or self.dirty.intersection(dependencies):
+                self.values[node] = function(self.values)
+                self.dirty.add(node)
+                recomputed.append(node)
+        self.dirty.clear()
+        self.last_recomputed = recomputed
+
+        v = self.values
+        return _recipe_result(v["names"], v["formulas"], v["fractions"], v["z_mix"], v["total_moles"],
+                              v["molar_masses"], v["moles"], v["weights"])
+
+
+def compute_recipes(mixtures, components=None):
+    """Compute the recipes of many mixtures; see `compute_recipe`."""
+    return [compute_recipe(mixture, components) for mixture in mixtures]
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python recipe_engine.py mixture.json
+    with open(CONFIG_FILE, "r") as file:
+        COMPONENTS = json.load(file)
+    with open(sys.argv[1], "r") as file:
+        recipe = load_recipe(json.load(file), COMPONENTS)
+    print(f"Z mix: {recipe['z_mix']:.4f}")
+    for row in recipe["components"]:
+        print(f"{row['name']:>25}: {row['weight']:.4f} g")
+    print(f"Total Weight: {recipe['total_weight']:.4f} g")
@@ -0,0 +1,119 @@
+import numpy as np
+
+# Heat capacity ratio (Cp/Cv) of the gases we fill, near room temperature.
+HEAT_CAPACITY_RATIO = {
+    "NITROGEN": 1.40,
+    "OXYGEN": 1.40,
+    "AIR": 1.40,
+    "HYDROGEN": 1.41,
+    "CARBON MONOXIDE": 1.40,
+    "ARGON": 1.67,
+    "HELIUM": 1.66,
+    "CARBON DIOXIDE": 1.29,
+    "METHANE": 1.31,
+    "HYDROGEN SULPHIDE": 1.32,
+    "SULPHUR HEXAFLUORIDE": 1.10,
+}
+
+DEFAULT_POLYTROPIC_INDEX = 1.1  # Polytropic index for heat exchange with environment (reasonable estimate)
+
+
+def heat_capacity_ratio(gas):
+    """
+    Look up gamma for a gas name or an array of gas names.
+
+    Numbers are passed through, so gamma can also be given directly.
+    """
+    gas = np.asarray(gas)
+    if gas.dtype.kind in "fiu":
+        return gas.astype(float)
+    names, inverse = np.unique(gas, return_inverse=True)
+    try:
+        gammas = np.array([HEAT_CAPACITY_RATIO[str(name).upper()] for name in names])
+    except KeyError as e:
+        raise ValueError(f"Unknown gas: {e.args[0]}") from None
+    return gammas[inverse].reshape(gas.shape)
+
+
+def polytropic_temperature(P_final, T_initial=298.0, gas="NITROGEN", P_initial=1.0, n=DEFAULT_POLYTROPIC_INDEX):
+    """
+    Temperature at the end of a polytropic compression from P_initial to P_final.
+
+    All arguments broadcast against each other, so a whole grid of pressures,
+    initial temperatures, gases and (fitted) indices is evaluated in one call.
+
+    Parameters:
+        P_final (float or array): Final pressure in bar.
+        T_initial (float or array): Initial temperature in Kelvin.
+        gas (str, float or array): Gas name(s) from HEAT_CAPACITY_RATIO, or gamma.
+        P_initial (float or array): Initial pressure in bar.
+        n (float or array): Polytropic index.
+
+    Returns:
+        ndarray: Final temperature in Kelvin.
+    """
+    gamma = heat_capacity_ratio(gas)
+    exponent = (gamma - 1) / np.asarray(n, dtype=float)
+    return np.asarray(T_initial, dtype=float) * (np.asarray(P_final, dtype=float) / P_initial) ** exponent
+
+
+def fit_polytropic_index(pressure_bar, temperature_K, T_initial, P_initial=1.0, gas="NITROGEN"):
+    """
+    Least-squares polytropic index for measured (pressure, temperature) points.
+
+    ln(T/T_initial) = (gamma - 1)/n * ln(P/P_initial) is a line through the
+    origin, so the fit is closed form.
+    """
+    x = np.log(np.asarray(pressure_bar, dtype=float) / P_initial)
+    y = np.log(np.asarray(temperature_K, dtype=float) / T_initial)
+    slope = np.dot(x, y) / np.dot(x, x)
+    return float((heat_capacity_ratio(gas) - 1) / slope)
+
+
+def fit_polytropic_indices(logs):
+    """
+    Fit one polytropic index per cylinder type from recorded fills.
+
+    Each log is a dict in the format of `filling_calibration.load_fill_log`
+    (time_s, gas_temp_C, pressure_bar) with a "cylinder_type" entry and
+    optionally "gas", "P_i" and "T_initial_celsius". The points of all logs of
+    a cylinder type are pooled into one fit.
+
+    Returns:
+        dict: Cylinder type -> polytropic index.
+    """
+    grouped = {}
+    for log in logs:
+        if log.get("pressure_bar") is None:
+            raise ValueError(f"Fill log '{log.get('name')}' has no pressure record.")
+        P_initial = log.get("P_i", 1.0)
+        T_initial = log.get("T_initial_celsius", log["gas_temp_C"][0]) + 273.15
+        # Normalise by (gamma - 1) so logs of different gases can be pooled.
+        x = np.log(log["pressure_bar"] / P_initial) * (heat_capacity_ratio(log.get("gas", "NITROGEN")) - 1)
+        y = np.log((log["gas_temp_C"] + 273.15) / T_initial)
+        xs, ys = grouped.setdefault(log["cylinder_type"], ([], []))
+        xs.append(x)
+        ys.append(y)
+
+    indices = {}
+    for cylinder_type, (xs, ys) in grouped.items():
+        x, y = np.concatenate(xs), np.concatenate(ys)
+        indices[cylinder_type] = float(np.dot(x, x) / np.dot(x, y))
+    return indices
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    T_initial = 298  # Initial temperature in Kelvin (25°C)
+    pressures = np.linspace(1, 150, num=500)  # Pressures from 1 to 150 bar
+    temperatures = polytropic_temperature(pressures, T_initial, "NITROGEN")
+
+    plt.plot(pressures, temperatures)
+    plt.xlabel('Pressure (bar)')
+    plt.ylabel('Temperature (K)')
+    plt.title('Temperature vs Pressure during Polytropic Compression of Nitrogen')
+    plt.grid(True)
+    plt.show()
+
+    print(f"Final temperature at 150 bar with heat exchange: {temperatures[-1]:.2f} K")